@@ -0,0 +1,88 @@
+"""Benchmark of the compiled MUD ACLs of the mud_manager integration.
+
+It builds a MUD file with thousands of ACEs, then measures how long it takes
+to compile it and to check a flow. Home Assistant is not needed:
+
+    python benchmarks/bench_mud_acl.py --aces 10000
+"""
+from __future__ import annotations
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+import timeit
+
+ACL_MODULE = os.path.join(os.path.dirname(__file__), "..", "mud_manager", "acl.py")
+
+
+def load_acl_module():
+    """Import acl.py without importing the mud_manager package (and Home Assistant)."""
+    spec = importlib.util.spec_from_file_location("mud_acl", ACL_MODULE)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_mud(aces: int) -> dict:
+    """Return a MUD file with <aces> ACEs split between the two directions."""
+
+    def _acl(name: str, key: str, count: int) -> dict:
+        return {
+            "name": name,
+            "type": "ipv4-acl-type",
+            "aces": {
+                "ace": [
+                    {
+                        "name": f"{name}-{i}",
+                        "matches": {"ipv4": {key: f"host-{i}.example.com"}},
+                        "actions": {"forwarding": "accept" if i % 10 else "drop"},
+                    }
+                    for i in range(count)
+                ]
+            },
+        }
+
+    return {
+        "ietf-mud:mud": {
+            "from-device-policy": {"access-lists": {"access-list": [{"name": "bench-fr"}]}},
+            "to-device-policy": {"access-lists": {"access-list": [{"name": "bench-to"}]}},
+        },
+        "ietf-access-control-list:acls": {
+            "acl": [
+                _acl("bench-fr", "ietf-acldns:dst-dnsname", aces // 2),
+                _acl("bench-to", "ietf-acldns:src-dnsname", aces - aces // 2),
+            ]
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--aces", type=int, default=10000, help="number of ACEs")
+    parser.add_argument("--checks", type=int, default=1000000, help="number of flow checks")
+    args = parser.parse_args()
+
+    acl = load_acl_module()
+    document = json.loads(json.dumps(build_mud(args.aces)))
+
+    start = time.perf_counter()
+    policy = acl.compile_mud(document)
+    compile_time = time.perf_counter() - start
+
+    hosts = [f"HOST-{random.randrange(args.aces)}.example.com." for _ in range(1024)]
+    hosts += ["unknown.example.org"] * 128
+    checks = iter(hosts * (args.checks // len(hosts) + 1))
+    check_time = timeit.timeit(lambda: policy.is_allowed(next(checks)), number=args.checks)
+
+    print(f"ACEs compiled:     {policy.aces}")
+    print(f"compile time:      {compile_time * 1000:.2f} ms")
+    print(f"flow checks:       {args.checks}")
+    print(f"time per check:    {check_time / args.checks * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""Mock REST server of the switch_remote and emulated_remote_temp_sensor integrations.
+
+It implements the endpoints used by the two integrations with the standard
+library only, so that polling, batching and failover can be measured on a
+single machine:
+
+    python benchmarks/mock_backend.py --port 8080 --latency 20 --error-rate 0.05
+
+    GET  /api/switches/<id>               {"id": 1, "value": true}
+    PUT  /api/switches/<id>               {"value": true}
+    GET  /api/switches?ids=1,2            [{"id": 1, "value": true}, ...]
+    GET  /api/switches/events             server-sent events {"id": 1, "value": true}
+    GET  /api/temperatures/last           {"value": 21.5, "timestamp": "..."}
+    POST /api/temperatures                {"value": 21.5}
+    POST /api/temperatures/bulk           [{"value": 21.5, "timestamp": "..."}, ...]
+    GET  /api/temperatures?since=<ts>     NDJSON, one reading per line, oldest first
+    GET  /api/stats                       requests, errors and latency per endpoint
+    POST /api/admin                       {"latency": 100, "error_rate": 0.5, "max_rps": 10, "down": 30}
+
+The optional endpoints (bulk, events, since) can be disabled to emulate an
+older server; the integrations must then fall back to their basic requests.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import bisect
+import json
+import logging
+import random
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+
+KEEPALIVE_INTERVAL = 15
+MAX_BODY_SIZE = 16 * 1024 * 1024
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+_LOGGER = logging.getLogger("mock_backend")
+
+
+class HttpError(Exception):
+    """Answer the request with an error status."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """Limit the requests per second, making the exceeding ones wait."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class Request:
+    """A parsed HTTP request."""
+
+    def __init__(self, method: str, target: str, headers: dict[str, str], body: bytes) -> None:
+        split = urlsplit(target)
+        self.method = method
+        self.path = split.path.rstrip("/") or "/"
+        self.query = {key: values[-1] for key, values in parse_qs(split.query).items()}
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError as ex:
+            raise HttpError(400, f"Invalid json: {ex}") from ex
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp, naive ones are UTC."""
+    timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+class MockBackend:
+    """State, load profile and counters of the mock server."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.latency = args.latency / 1000
+        self.jitter = args.jitter / 1000
+        self.error_rate = args.error_rate
+        self.bucket = TokenBucket(args.max_rps)
+        self.bulk = not args.no_bulk
+        self.events = not args.no_events
+        self.sync = not args.no_sync
+        self.down_until = 0.0
+        self.started = time.monotonic()
+
+        self.switches: dict[int, bool] = {}
+        # (timestamp, value, iso timestamp), sorted by timestamp
+        self.readings: list[tuple[datetime, float, str]] = []
+        self.subscribers: set[asyncio.Queue[str]] = set()
+
+        self.requests: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.latency_total: Counter[str] = Counter()
+
+    # Connection handling
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while not reader.at_eof():
+                request = await self.read_request(reader)
+                if request is None:
+                    break
+                if time.monotonic() < self.down_until:
+                    break  # Emulating a server that is down
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                await self.handle_request(request, writer)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, HttpError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader: asyncio.StreamReader) -> Request | None:
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError as ex:
+            raise HttpError(400, "Invalid request line") from ex
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY_SIZE:
+            raise HttpError(400, "Body too large")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, headers, body)
+
+    async def handle_request(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        start = time.perf_counter()
+        handler, endpoint, args = self.route(request)
+        self.requests[endpoint] += 1
+
+        await self.bucket.acquire()
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        status = 200
+        try:
+            if handler is None:
+                raise HttpError(404, f"No endpoint {request.method} {request.path}")
+            if not endpoint.startswith(("GET /api/stats", "POST /api/admin")) and (
+                random.random() < self.error_rate
+            ):
+                raise HttpError(500, "Injected error")
+            await handler(request, writer, *args)
+        except HttpError as ex:
+            status = ex.status
+            await self.send_json(writer, {"error": str(ex)}, status)
+        if status >= 400:
+            self.errors[endpoint] += 1
+        self.latency_total[endpoint] += time.perf_counter() - start
+        _LOGGER.debug("%s %s %d", request.method, request.path, status)
+
+    def route(self, request: Request):
+        """Return the handler, the name of the endpoint and the path arguments."""
+        method, parts = request.method, request.path.strip("/").split("/")
+        name = f"{method} {request.path}"
+        if parts[:2] == ["api", "switches"]:
+            if len(parts) == 2 and method == "GET":
+                return (self.get_switches if self.bulk else None), "GET /api/switches", ()
+            if len(parts) == 3 and parts[2] == "events" and method == "GET":
+                return (self.get_events if self.events else None), "GET /api/switches/events", ()
+            if len(parts) == 3 and parts[2].isdigit():
+                handler = {"GET": self.get_switch, "PUT": self.put_switch}.get(method)
+                return handler, f"{method} /api/switches/<id>", (int(parts[2]),)
+        elif parts[:2] == ["api", "temperatures"]:
+            if len(parts) == 2:
+                if method == "POST":
+                    return self.post_temperature, "POST /api/temperatures", ()
+                if method == "GET":
+                    return (self.get_temperatures if self.sync else None), "GET /api/temperatures", ()
+            elif parts[2] == "last" and method == "GET":
+                return self.get_last_temperature, "GET /api/temperatures/last", ()
+            elif parts[2] == "bulk" and method == "POST":
+                return (self.post_temperatures if self.bulk else None), "POST /api/temperatures/bulk", ()
+        elif request.path == "/api/stats" and method == "GET":
+            return self.get_stats, "GET /api/stats", ()
+        elif request.path == "/api/admin" and method == "POST":
+            return self.post_admin, "POST /api/admin", ()
+        return None, name, ()
+
+    # Responses
+
+    @staticmethod
+    def write_head(
+        writer: asyncio.StreamWriter, status: int, content_type: str, length: int | None
+    ) -> None:
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}", f"Content-Type: {content_type}"]
+        if length is None:
+            head += ["Transfer-Encoding: chunked", "Cache-Control: no-cache"]
+        else:
+            head.append(f"Content-Length: {length}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+
+    async def send_json(self, writer: asyncio.StreamWriter, value, status: int = 200) -> None:
+        body = json.dumps(value).encode()
+        self.write_head(writer, status, "application/json", len(body))
+        writer.write(body)
+        await writer.drain()
+
+    @staticmethod
+    async def send_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        await writer.drain()
+
+    # Switches
+
+    async def get_switch(self, request: Request, writer, switch_id: int) -> None:
+        await self.send_json(writer, {"id": switch_id, "value": self.switches.get(switch_id, False)})
+
+    async def put_switch(self, request: Request, writer, switch_id: int) -> None:
+        body = request.json()
+        if not isinstance(body, dict) or "value" not in body:
+            raise HttpError(400, "Missing value")
+        value = bool(body["value"])
+        if self.switches.get(switch_id) != value:
+            self.switches[switch_id] = value
+            event = json.dumps({"id": switch_id, "value": value})
+            for queue in self.subscribers:
+                queue.put_nowait(f"data: {event}\n\n")
+        await self.send_json(writer, {"id": switch_id, "value": value})
+
+    async def get_switches(self, request: Request, writer) -> None:
+        try:
+            switch_ids = [int(switch_id) for switch_id in request.query.get("ids", "").split(",") if switch_id]
+        except ValueError as ex:
+            raise HttpError(400, "Invalid ids") from ex
+        await self.send_json(
+            writer,
+            [{"id": switch_id, "value": self.switches.get(switch_id, False)} for switch_id in switch_ids],
+        )
+
+    async def get_events(self, request: Request, writer) -> None:
+        queue: asyncio.Queue[str] = asyncio.Queue()
+        self.subscribers.add(queue)
+        try:
+            self.write_head(writer, 200, "text/event-stream", None)
+            await self.send_chunk(writer, b": connected\n\n")
+            while time.monotonic() >= self.down_until:
+                try:
+                    message = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    message = ": keep-alive\n\n"
+                await self.send_chunk(writer, message.encode())
+        finally:
+            self.subscribers.discard(queue)
+        raise ConnectionError("Server down")
+
+    # Temperatures
+
+    def add_reading(self, value, timestamp: str | None) -> None:
+        try:
+            value = float(value)
+            when = parse_timestamp(timestamp) if timestamp else datetime.now(timezone.utc)
+        except (TypeError, ValueError) as ex:
+            raise HttpError(400, f"Invalid reading: {ex}") from ex
+        bisect.insort(self.readings, (when, value, when.isoformat()))
+
+    async def get_last_temperature(self, request: Request, writer) -> None:
+        if not self.readings:
+            raise HttpError(404, "No temperature stored")
+        _, value, timestamp = self.readings[-1]
+        await self.send_json(writer, {"value": value, "timestamp": timestamp})
+
+    async def post_temperature(self, request: Request, writer) -> None:
+        body = request.json()
+        if not isinstance(body, dict):
+            raise HttpError(400, "Expected an object")
+        self.add_reading(body.get("value"), body.get("timestamp"))
+        await self.send_json(writer, {"stored": 1})
+
+    async def post_temperatures(self, request: Request, writer) -> None:
+        body = request.json()
+        if not isinstance(body, list):
+            raise HttpError(400, "Expected a list")
+        for reading in body:
+            if not isinstance(reading, dict):
+                raise HttpError(400, "Expected a list of objects")
+            self.add_reading(reading.get("value"), reading.get("timestamp"))
+        await self.send_json(writer, {"stored": len(body)})
+
+    async def get_temperatures(self, request: Request, writer) -> None:
+        start = 0
+        if "since" in request.query:
+            try:
+                since = parse_timestamp(request.query["since"])
+            except ValueError as ex:
+                raise HttpError(400, f"Invalid since: {ex}") from ex
+            start = bisect.bisect_right(self.readings, since, key=lambda reading: reading[0])
+        readings = self.readings[start:]  # Snapshot, the list may grow while streaming
+
+        self.write_head(writer, 200, "application/x-ndjson", None)
+        for index in range(0, len(readings), 1000):
+            lines = "".join(
+                json.dumps({"value": value, "timestamp": timestamp}) + "\n"
+                for _, value, timestamp in readings[index : index + 1000]
+            )
+            await self.send_chunk(writer, lines.encode())
+        await self.send_chunk(writer, b"")
+
+    # Monitoring
+
+    async def get_stats(self, request: Request, writer) -> None:
+        await self.send_json(
+            writer,
+            {
+                "uptime": round(time.monotonic() - self.started, 1),
+                "endpoints": {
+                    endpoint: {
+                        "requests": count,
+                        "errors": self.errors[endpoint],
+                        "avg_latency_ms": round(1000 * self.latency_total[endpoint] / count, 2),
+                    }
+                    for endpoint, count in sorted(self.requests.items())
+                },
+                "switches": {str(switch_id): value for switch_id, value in sorted(self.switches.items())},
+                "readings": len(self.readings),
+                "subscribers": len(self.subscribers),
+                "profile": {
+                    "latency_ms": self.latency * 1000,
+                    "error_rate": self.error_rate,
+                    "max_rps": self.bucket.rate,
+                },
+            },
+        )
+
+    async def post_admin(self, request: Request, writer) -> None:
+        body = request.json()
+        if not isinstance(body, dict):
+            raise HttpError(400, "Expected an object")
+        try:
+            if "latency" in body:
+                self.latency = float(body["latency"]) / 1000
+            if "error_rate" in body:
+                self.error_rate = float(body["error_rate"])
+            if "max_rps" in body:
+                self.bucket.rate = float(body["max_rps"])
+            if "down" in body:
+                # The connections are dropped once this answer is sent
+                self.down_until = time.monotonic() + float(body["down"])
+        except (TypeError, ValueError) as ex:
+            raise HttpError(400, f"Invalid value: {ex}") from ex
+        await self.send_json(writer, {"ok": True})
+
+
+async def serve(args: argparse.Namespace) -> None:
+    backend = MockBackend(args)
+    server = await asyncio.start_server(backend.handle_connection, args.host, args.port)
+    _LOGGER.info("Mock backend listening on http://%s:%d", args.host, args.port)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0, help="added latency (ms)")
+    parser.add_argument("--jitter", type=float, default=0, help="random +/- latency (ms)")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of 500 answers")
+    parser.add_argument("--max-rps", type=float, default=0, help="requests per second, 0 for no cap")
+    parser.add_argument("--no-bulk", action="store_true", help="disable the bulk endpoints")
+    parser.add_argument("--no-events", action="store_true", help="disable the events stream")
+    parser.add_argument("--no-sync", action="store_true", help="disable /api/temperatures?since=")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from typing import Final
+from collections.abc import Iterator
+from typing import Any, Final
+import json
 import logging
 
 from homeassistant.core import HomeAssistant
@@ -12,17 +14,34 @@ MUD_ONLY_KEY = "only_mud_manifest"
 INTEGRATIONS_KEY = "print_integrations"
 ENTITIES_KEY = "print_entities"
 SERVICES_KEY = "print_services"
+EXPORT_PATH_KEY = "export_path"
+EXPORT_DOMAINS_KEY = "export_domains"
+MUD_MANAGER_DOMAIN = "mud_manager"
+MUD_DOMAINS_KEY = "mud_domains"
 
 DEFAULT_NAME = "Button List"
 UNIQUE_ID_PREFIX = "PoliTo.e-Lite.LM."
+EXPORT_CHUNK_SIZE = 500  # Number of records written by each executor job
+
+""" When "export_path" is configured the inventory is not printed on the console:
+    it is streamed to the given file as newline-delimited JSON, one record per
+    integration (with its manifest), entity and service.
+
+    button:
+    - platform: button_list
+      export_path: /config/inventory.jsonl
+      export_domains:     // optional, export only these domains
+        - light
+        - switch
+"""
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def setup_platform(
+async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
-    add_entities: AddEntitiesCallback,
+    async_add_entities: AddEntitiesCallback,
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up the button."""
@@ -47,11 +66,28 @@ def setup_platform(
         print_services = config[SERVICES_KEY]
     else:
         print_services = False
+    if EXPORT_PATH_KEY in config:
+        export_path = hass.config.path(config[EXPORT_PATH_KEY])
+    else:
+        export_path = None
+    if EXPORT_DOMAINS_KEY in config:
+        export_domains = config[EXPORT_DOMAINS_KEY]
+    else:
+        export_domains = None
 
-    add_entities(
-        [ButtonList(name, mud_only, print_entities, print_integrations, print_services)]
+    async_add_entities(
+        [
+            ButtonList(
+                name,
+                mud_only,
+                print_entities,
+                print_integrations,
+                print_services,
+                export_path,
+                export_domains,
+            )
+        ]
     )
-    return True
 
 
 class ButtonList(ButtonEntity):
@@ -64,6 +100,8 @@ class ButtonList(ButtonEntity):
         print_entities=False,
         print_integrations=False,
         print_services=False,
+        export_path: str | None = None,
+        export_domains: list[str] | None = None,
     ) -> None:
         """Initialize the button."""
         self._name = name
@@ -72,7 +110,10 @@ class ButtonList(ButtonEntity):
         self._print_entities = print_entities
         self._print_integrations = print_integrations
         self._print_services = print_services
-        self.press()  # self.hass not available during init
+        self._export_path = export_path
+        self._export_domains: Final[set[str] | None] = (
+            set(export_domains) if export_domains else None
+        )
 
     @property
     def name(self):
@@ -83,12 +124,12 @@ class ButtonList(ButtonEntity):
     def unique_id(self) -> str | None:
         return self._unique_id
 
-    def press(self) -> None:
+    async def async_press(self) -> None:
         """Handle the button press."""
 
         _LOGGER.debug("<%s> pressed", self.name)
-        if not self.hass:
-            _LOGGER.warning("<hass> object not available now!")
+        if self._export_path:
+            await self.async_export_inventory()
             return
 
         if self._mud_only:
@@ -112,6 +153,13 @@ class ButtonList(ButtonEntity):
     def print_manifests_with_mud_snippet(self):
         """This method prints on the console the manifests of all the integrations with a specified MUD snippet."""
         integrations = self.hass.data["integrations"]
+        mud_manager = self.hass.data.get(MUD_MANAGER_DOMAIN)
+        if mud_manager is not None:
+            integrations = {
+                domain: integrations[domain]
+                for domain in mud_manager[MUD_DOMAINS_KEY](self.hass)
+                if domain in integrations
+            }
         for key, value in integrations.items():
             _LOGGER.debug("%s --- %s", key, value)
 
@@ -142,16 +190,77 @@ class ButtonList(ButtonEntity):
         if self._print_entities:
             n_entities = self.hass.states.async_entity_ids_count()
             _LOGGER.info("\nNumber of available entities: <%d>\n", n_entities)
-            for ent in self.hass.states.all():
+            for ent in self.hass.states.async_all():
                 # To print only some entitites
                 # if "switch" in ent.object_id or "light" in ent.object_id:
                 _LOGGER.info(ent)
             _LOGGER.info("\n\n")
 
         if self._print_services:
-            services = self.hass.services.services
+            services = self.hass.services.async_services()
             _LOGGER.info("\nList of available services:")
             for x, domain in services.items():
                 _LOGGER.info("--- %s ---", x)
                 for s in domain:
                     _LOGGER.info(s)
+
+    def iter_inventory(self) -> Iterator[dict[str, Any]]:
+        """Yield one record for each integration, entity and service.
+
+        Only the snapshots of the collections are kept in memory: the records
+        are built one at a time while they are consumed.
+        """
+        domains = self._export_domains
+        components = self.hass.config.components
+
+        for domain, integration in list(self.hass.data["integrations"].items()):
+            if domains and domain not in domains:
+                continue
+            manifest = getattr(integration, "manifest", None)
+            if manifest is None:  # Still loading
+                continue
+            yield {
+                "type": "integration",
+                "domain": domain,
+                "loaded": domain in components,
+                "manifest": manifest,
+            }
+
+        if domains:
+            states = self.hass.states.async_all(domains)
+        else:
+            states = self.hass.states.async_all()
+        for state in states:
+            yield {"type": "entity", **state.as_dict()}
+
+        for domain, services in self.hass.services.async_services().items():
+            if domains and domain not in domains:
+                continue
+            for service in services:
+                yield {"type": "service", "domain": domain, "service": service}
+
+    async def async_export_inventory(self) -> None:
+        """Stream the inventory to <export_path> as newline-delimited JSON.
+
+        The records are serialized on the event loop in chunks, and each chunk
+        is written by a job in the executor.
+        """
+        file = await self.hass.async_add_executor_job(
+            open, self._export_path, "w", 1024 * 1024, "utf-8"
+        )
+        exported = 0
+        try:
+            chunk: list[str] = []
+            for record in self.iter_inventory():
+                chunk.append(json.dumps(record, default=str))
+                if len(chunk) == EXPORT_CHUNK_SIZE:
+                    await self.hass.async_add_executor_job(file.write, "\n".join(chunk) + "\n")
+                    exported += len(chunk)
+                    chunk = []
+            if chunk:
+                await self.hass.async_add_executor_job(file.write, "\n".join(chunk) + "\n")
+                exported += len(chunk)
+        finally:
+            await self.hass.async_add_executor_job(file.close)
+
+        _LOGGER.info("%d records exported to <%s>", exported, self._export_path)
@@ -1,46 +1,131 @@
-from __future__ import annotations
-import logging
-
-# Import the device class from the component that you want to support
-from homeassistant.core import HomeAssistant, split_entity_id
-from homeassistant.components.button import ButtonEntity
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-
-DEFAULT_NAME = "Button Off"
-
-
-_LOGGER = logging.getLogger(__name__)
-
-
-def setup_platform(
-    hass: HomeAssistant,
-    config: ConfigType,
-    add_entities: AddEntitiesCallback,
-    discovery_info: DiscoveryInfoType | None = None,
-) -> None:
-    add_entities([ButtonOff()])
-
-    return True
-
-
-class ButtonOff(ButtonEntity):
-    """This button turns off all the available entitites."""
-
-    def __init__(self, name: str = DEFAULT_NAME) -> None:
-        self._attr_name = name
-        _LOGGER.debug("Button Off initialized\n")
-
-    def press(self) -> None:
-        """Handle the button press."""
-        _LOGGER.info("Button Off pressed\n")
-
-        entities = self.hass.states.entity_ids()
-        for key in entities:
-            domain = split_entity_id(key)
-            if self.hass.services.has_service(domain=domain[0], service="turn_off"):
-                self.hass.services.call(
-                    domain=domain[0],
-                    service="turn_off",
-                    target={"entity_id": key},
-                )
+from __future__ import annotations
+from collections import defaultdict
+import asyncio
+import logging
+import time
+
+# Import the device class from the component that you want to support
+from homeassistant.core import HomeAssistant, State
+from homeassistant.const import ATTR_SUPPORTED_FEATURES
+from homeassistant.components.button import ButtonEntity
+from homeassistant.components.climate import ClimateEntityFeature
+from homeassistant.components.fan import FanEntityFeature
+from homeassistant.components.media_player import MediaPlayerEntityFeature
+from homeassistant.components.vacuum import VacuumEntityFeature
+from homeassistant.components.water_heater import WaterHeaterEntityFeature
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+
+DEFAULT_NAME = "Button Off"
+TIMEOUT_KEY = "timeout"
+DEFAULT_TIMEOUT = 30
+TURN_OFF_SERVICE = "turn_off"
+# Domains whose entities support turn_off only if they declare this feature:
+# the service fails if one of the listed entities does not
+TURN_OFF_FEATURES = {
+    "climate": ClimateEntityFeature.TURN_OFF,
+    "fan": FanEntityFeature.TURN_OFF,
+    "media_player": MediaPlayerEntityFeature.TURN_OFF,
+    "vacuum": VacuumEntityFeature.TURN_OFF,
+    "water_heater": WaterHeaterEntityFeature.ON_OFF,
+}
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_platform(
+    hass: HomeAssistant,
+    config: ConfigType,
+    async_add_entities: AddEntitiesCallback,
+    discovery_info: DiscoveryInfoType | None = None,
+) -> None:
+    if TIMEOUT_KEY in config:
+        timeout = config[TIMEOUT_KEY]
+    else:
+        timeout = DEFAULT_TIMEOUT
+
+    async_add_entities([ButtonOff(timeout=timeout)])
+
+
+def supports_turn_off(state: State) -> bool:
+    """Return False if the entity of <state> does not declare the turn_off feature."""
+    feature = TURN_OFF_FEATURES.get(state.domain)
+    if feature is None:
+        return True
+    return bool(state.attributes.get(ATTR_SUPPORTED_FEATURES, 0) & feature)
+
+
+class ButtonOff(ButtonEntity):
+    """This button turns off all the available entitites."""
+
+    def __init__(self, name: str = DEFAULT_NAME, timeout: float = DEFAULT_TIMEOUT) -> None:
+        self._attr_name = name
+        self._timeout = timeout
+        self._attr_extra_state_attributes = {}
+        _LOGGER.debug("Button Off initialized\n")
+
+    async def async_press(self) -> None:
+        """Handle the button press.
+
+        The entities are grouped by domain, so that a single turn_off call is
+        issued for each domain, and the calls are run concurrently. The
+        entities not supporting turn_off are skipped, not to fail the call of
+        their whole domain.
+        """
+        _LOGGER.info("Button Off pressed\n")
+        start = time.monotonic()
+
+        entities_by_domain: dict[str, list[str]] = defaultdict(list)
+        for state in self.hass.states.async_all():
+            if supports_turn_off(state):
+                entities_by_domain[state.domain].append(state.entity_id)
+
+        services = self.hass.services.async_services()
+        targets = {
+            domain: entity_ids
+            for domain, entity_ids in entities_by_domain.items()
+            if TURN_OFF_SERVICE in services.get(domain, {})
+        }
+
+        tasks = {
+            self.hass.async_create_task(
+                self.hass.services.async_call(
+                    domain,
+                    TURN_OFF_SERVICE,
+                    target={"entity_id": entity_ids},
+                    blocking=True,
+                    context=self._context,
+                )
+            ): domain
+            for domain, entity_ids in targets.items()
+        }
+        turned_off = 0
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=self._timeout)
+            for task in pending:
+                _LOGGER.error(
+                    "Turning off <%s> entities took more than %s seconds",
+                    tasks[task], self._timeout,
+                )
+                task.cancel()
+            for task in done:
+                if task.exception():
+                    _LOGGER.error(
+                        "Impossible to turn off <%s> entities: %s",
+                        tasks[task], repr(task.exception()),
+                    )
+                else:
+                    turned_off += len(targets[tasks[task]])
+
+        duration = time.monotonic() - start
+        _LOGGER.info(
+            "%d entities of %d domains turned off in %.3f seconds",
+            turned_off, len(targets), duration,
+        )
+        self._attr_extra_state_attributes = {
+            "turned_off": turned_off,
+            "domains": len(targets),
+            "duration": round(duration, 3),
+        }
+        self.async_write_ha_state()
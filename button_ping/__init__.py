@@ -1,4 +1,24 @@
 """ This button component ping some domains inserted in the configuration file. """
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.typing import ConfigType
 
 # The domain of your component. Should be equal to the name of your component.
 DOMAIN = "button_ping"
+
+CONFIG_KEY = "config"
+RESULTS_KEY = "results"
+WINDOWS_KEY = "windows"
+MONITORS_KEY = "monitors"
+
+# Sent through the dispatcher every time new ping results are available
+SIGNAL_PING_RESULTS = f"{DOMAIN}_results"
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Keep the Home Assistant configuration, it is needed to load the sensors."""
+    hass.data.setdefault(
+        DOMAIN, {RESULTS_KEY: {}, WINDOWS_KEY: {}, MONITORS_KEY: set()}
+    )[CONFIG_KEY] = config
+    return True
@@ -1,28 +1,68 @@
 from __future__ import annotations
+from datetime import datetime, timedelta
 from typing import Final
-import time
+import asyncio
 import logging
-from icmplib import ping
+from icmplib import Host, ICMPLibError, async_ping
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.discovery import async_load_platform
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 from homeassistant.components.button import ButtonEntity
 
+from . import (
+    CONFIG_KEY,
+    DOMAIN,
+    MONITORS_KEY,
+    RESULTS_KEY,
+    SIGNAL_PING_RESULTS,
+    WINDOWS_KEY,
+)
+from .stats import DEFAULT_WINDOW_SIZE, LatencyWindow
+
 
 _LOGGER = logging.getLogger(__name__)
 
 WAITING_TIME_KEY = "waiting_time"
 PING_NUMBER_KEY = "ping_number"
+COUNT_KEY = "count"
 DOMAINS_KEY = "urls"
+MONITOR_INTERVAL_KEY = "monitor_interval"
+WINDOW_SIZE_KEY = "window_size"
 DEFAULT_WAITING_TIME = 60
 DEFAULT_PING_NUMBER = 1
+DEFAULT_COUNT = 4  # Echo requests sent to each url in a round, as icmplib.ping
+MONITOR_COUNT = 1  # The background probes send a single echo request
 DEFAULT_DOMAINS = ["homeassistant.io"]
+MAX_CONCURRENT_PINGS = 50
+MUD_MANAGER_DOMAIN = "mud_manager"
+MUD_IS_ALLOWED_KEY = "is_allowed"
+
+""" When the button is pressed all the urls are pinged concurrently, the
+    following rounds are scheduled every <waiting_time> seconds.
+    The results of each url are published as sensors.
+
+    button:
+    - platform: button_ping
+      urls:
+        - homeassistant.io
+        - 192.168.1.1
+      ping_number: 3    // number of rounds
+      count: 4          // echo requests sent to each url in a round
+      waiting_time: 60  // seconds among two rounds
+      monitor_interval: 30  // optional, keep probing the urls in background every x seconds
+      window_size: 120      // optional, number of probes used for the latency statistics
+"""
+
 
-def setup_platform(
+async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
-    add_entities: AddEntitiesCallback,
+    async_add_entities: AddEntitiesCallback,
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up the button."""
@@ -39,22 +79,147 @@ def setup_platform(
     if PING_NUMBER_KEY in config:
         ping_number = config[PING_NUMBER_KEY]
 
-    add_entities([ButtonPing(urls, waiting_time, ping_number)])
+    count = DEFAULT_COUNT
+    if COUNT_KEY in config:
+        count = config[COUNT_KEY]
+
+    window_size = DEFAULT_WINDOW_SIZE
+    if WINDOW_SIZE_KEY in config:
+        window_size = config[WINDOW_SIZE_KEY]
+
+    windows = hass.data[DOMAIN][WINDOWS_KEY]
+    for url in urls:
+        windows.setdefault(url, LatencyWindow(window_size))
+
+    monitor_interval = None
+    if MONITOR_INTERVAL_KEY in config:
+        monitor_interval = config[MONITOR_INTERVAL_KEY]
+
+    async_add_entities(
+        [ButtonPing(urls, waiting_time, ping_number, count, monitor_interval)]
+    )
+
+    # The results of the pings are exposed by the sensor platform
+    hass.async_create_task(
+        async_load_platform(
+            hass,
+            Platform.SENSOR,
+            DOMAIN,
+            {DOMAINS_KEY: urls},
+            hass.data[DOMAIN][CONFIG_KEY],
+        )
+    )
+
+
+async def async_ping_hosts(
+    hass: HomeAssistant, urls: list[str], count: int = DEFAULT_COUNT
+) -> list[Host | None]:
+    """Ping all the urls concurrently, None is returned for the failed ones.
+
+    Like icmplib.async_multiping, but an unresolvable url (or one denied by
+    the MUD file) does not spoil the results of the other ones.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PINGS)
+    mud_is_allowed = hass.data[MUD_MANAGER_DOMAIN][MUD_IS_ALLOWED_KEY]
+
+    async def _async_ping(url: str) -> Host | None:
+        if not mud_is_allowed(hass, DOMAIN, url):
+            return None
+        async with semaphore:
+            try:
+                return await async_ping(url, count=count)
+            except ICMPLibError as ex:
+                _LOGGER.warning("Impossible to ping %s: %s", url, ex)
+                return None
+
+    return await asyncio.gather(*(_async_ping(url) for url in urls))
+
 
-    # To indicate that initialization was successfully.
-    return True
+@callback
+def async_store_results(
+    hass: HomeAssistant, urls: list[str], hosts: list[Host | None]
+) -> None:
+    """Publish the results of a round and add them to the rolling statistics."""
+    results = hass.data[DOMAIN][RESULTS_KEY]
+    windows = hass.data[DOMAIN][WINDOWS_KEY]
+    for url, host in zip(urls, hosts):
+        results[url] = host
+        window = windows[url]
+        if host is None:
+            window.add(None)
+            continue
+        for rtt in host.rtts:
+            window.add(rtt)
+        for _ in range(host.packets_sent - host.packets_received):
+            window.add(None)
+    async_dispatcher_send(hass, SIGNAL_PING_RESULTS)
+
+
+@callback
+def async_start_monitor(
+    hass: HomeAssistant, urls: list[str], interval: float
+) -> CALLBACK_TYPE:
+    """Keep probing the urls in background every <interval> seconds.
+
+    The urls already monitored by another button are skipped. Return the
+    callback stopping the monitor.
+    """
+    monitored = hass.data[DOMAIN][MONITORS_KEY]
+    urls = [url for url in urls if url not in monitored]
+    monitored.update(urls)
+    probe: asyncio.Task | None = None
+
+    @callback
+    def _async_probe(now: datetime) -> None:
+        nonlocal probe
+        if probe and not probe.done():
+            _LOGGER.debug("Previous probe still in progress, skipping this one")
+            return
+        probe = hass.async_create_task(_async_probe_urls())
+
+    async def _async_probe_urls() -> None:
+        async_store_results(hass, urls, await async_ping_hosts(hass, urls, MONITOR_COUNT))
+
+    unsub_timer = None
+    if urls:
+        _LOGGER.info("Monitoring %d urls every %s seconds", len(urls), interval)
+        unsub_timer = async_track_time_interval(
+            hass, _async_probe, timedelta(seconds=interval)
+        )
+
+    @callback
+    def _async_stop() -> None:
+        if unsub_timer:
+            unsub_timer()
+        if probe and not probe.done():
+            probe.cancel()
+        monitored.difference_update(urls)
+
+    return _async_stop
 
 
 class ButtonPing(ButtonEntity):
     "When the button is pressed, it starts pinging the specified domains"
 
-    def __init__(self, urls, waiting_time=DEFAULT_WAITING_TIME, ping_number=DEFAULT_PING_NUMBER):
+    def __init__(
+        self,
+        urls,
+        waiting_time=DEFAULT_WAITING_TIME,
+        ping_number=DEFAULT_PING_NUMBER,
+        count: int = DEFAULT_COUNT,
+        monitor_interval: float | None = None,
+    ):
         """Initialize the button."""
         self._name = "Button Ping"
         self._unique_id = "PoliTo.e-Lite.LM."+self._name
         self._urls: Final[list[str]] = urls
         self._waiting_time: Final[float] = waiting_time
         self._ping_number: Final[float] = ping_number
+        self._count: Final[int] = count
+        self._monitor_interval: Final[float | None] = monitor_interval
+        self._rounds_left = 0
+        self._ping_task: asyncio.Task | None = None
+        self._unsub_rounds = None
 
         _LOGGER.debug("List of domains: {}".format('; '.join(map(str, self._urls))))
         _LOGGER.debug("Numer of pings per domain: %d - waiting time among pings: %d seconds", self._ping_number, self._waiting_time)
@@ -68,22 +233,72 @@ class ButtonPing(ButtonEntity):
     def unique_id(self) -> str | None:
         return self._unique_id
 
-    def press(self) -> None:
-        """Handle the button press."""
+    async def async_press(self) -> None:
+        """Handle the button press.
+
+        Pressing the button again cancels the pings still in progress.
+        """
+        if self._rounds_left or (self._ping_task and not self._ping_task.done()):
+            _LOGGER.info("Pings in progress cancelled")
+        self._async_stop()
 
         _LOGGER.info("Start pinging")
+        self._rounds_left = self._ping_number
+        self._async_start_round()
+        if self._rounds_left:
+            self._unsub_rounds = async_track_time_interval(
+                self.hass,
+                self._async_start_round,
+                timedelta(seconds=self._waiting_time),
+            )
+
+    async def async_added_to_hass(self) -> None:
+        """Start the background monitor, if configured."""
+        if self._monitor_interval is not None:
+            self.async_on_remove(
+                async_start_monitor(self.hass, self._urls, self._monitor_interval)
+            )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop pinging when the button is removed."""
+        self._async_stop()
+
+    @callback
+    def _async_stop(self) -> None:
+        self._rounds_left = 0
+        if self._unsub_rounds:
+            self._unsub_rounds()
+            self._unsub_rounds = None
+        if self._ping_task and not self._ping_task.done():
+            self._ping_task.cancel()
+        self._ping_task = None
+
+    @callback
+    def _async_start_round(self, now: datetime | None = None) -> None:
+        """Start a round pinging all the urls."""
+        if self._ping_task and not self._ping_task.done():
+            _LOGGER.warning("Previous round still in progress, skipping this one")
+            return
+
+        self._rounds_left -= 1
+        if self._rounds_left <= 0 and self._unsub_rounds:
+            self._unsub_rounds()
+            self._unsub_rounds = None
+        self._ping_task = self.hass.async_create_task(
+            self._async_ping_round(self._rounds_left <= 0)
+        )
 
-        for _ in range(self._ping_number):
-            for url in self._urls:
-                _LOGGER.debug("Pinging %s", url)
-                host = ping(url)
-                if host.is_alive:
-                    _LOGGER.debug("Average Ping RTT: %d ms", host.avg_rtt)
-                else:
-                    _LOGGER.debug("Host unreachable")
-                time.sleep(self._waiting_time)
+    async def _async_ping_round(self, last: bool) -> None:
+        hosts = await async_ping_hosts(self.hass, self._urls, self._count)
 
-        _LOGGER.info("Pings completed")
+        for url, host in zip(self._urls, hosts):
+            if host is None:
+                continue
+            if host.is_alive:
+                _LOGGER.debug("%s - Average Ping RTT: %d ms", url, host.avg_rtt)
+            else:
+                _LOGGER.debug("%s - Host unreachable", url)
+        async_store_results(self.hass, self._urls, hosts)
 
-    # async def async_press(self) -> None:
-    #    """Handle the button press."""
+        if last:
+            _LOGGER.info("Pings completed")
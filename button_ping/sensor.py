@@ -0,0 +1,131 @@
+"""Sensors exposing the results of the pings sent by the Button Ping."""
+from __future__ import annotations
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+
+from icmplib import Host
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import PERCENTAGE, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+
+from . import DOMAIN, RESULTS_KEY, SIGNAL_PING_RESULTS, WINDOWS_KEY
+
+DOMAINS_KEY = "urls"
+UNIQUE_ID_PREFIX = "PoliTo.e-Lite.LM."
+PERCENTILES = (50, 95, 99)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class PingSensorEntityDescription(SensorEntityDescription):
+    """Describe a measurement taken from the results of a ping."""
+
+    value_fn: Callable[[Host], float | None] = lambda host: None
+    # Expose the rolling statistics of the url as attributes
+    statistics: bool = False
+
+
+SENSORS: tuple[PingSensorEntityDescription, ...] = (
+    PingSensorEntityDescription(
+        key="min_rtt",
+        name="RTT min",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda host: host.min_rtt if host.is_alive else None,
+    ),
+    PingSensorEntityDescription(
+        key="avg_rtt",
+        name="RTT avg",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda host: host.avg_rtt if host.is_alive else None,
+        statistics=True,
+    ),
+    PingSensorEntityDescription(
+        key="max_rtt",
+        name="RTT max",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda host: host.max_rtt if host.is_alive else None,
+    ),
+    PingSensorEntityDescription(
+        key="packet_loss",
+        name="packet loss",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda host: host.packet_loss * 100,
+    ),
+)
+
+
+async def async_setup_platform(
+    hass: HomeAssistant,
+    config: ConfigType,
+    async_add_entities: AddEntitiesCallback,
+    discovery_info: DiscoveryInfoType | None = None,
+) -> None:
+    """Set up the sensors of the urls pinged by the button."""
+    if discovery_info is None:
+        _LOGGER.warning("The sensors are created by the button_ping button")
+        return
+
+    async_add_entities(
+        [
+            PingSensor(url, description)
+            for url in discovery_info[DOMAINS_KEY]
+            for description in SENSORS
+        ]
+    )
+
+
+class PingSensor(SensorEntity):
+    """A measurement of the last ping sent to an url."""
+
+    entity_description: PingSensorEntityDescription
+    _attr_should_poll = False
+
+    def __init__(self, url: str, description: PingSensorEntityDescription) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._url = url
+        self._attr_name = f"Ping {url} {description.name}"
+        self._attr_unique_id = f"{UNIQUE_ID_PREFIX}{DOMAIN}.{url}.{description.key}"
+
+    async def async_added_to_hass(self) -> None:
+        """Listen for new ping results."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_PING_RESULTS, self._async_handle_results
+            )
+        )
+        self._async_handle_results(write=False)
+
+    @callback
+    def _async_handle_results(self, write: bool = True) -> None:
+        host = self.hass.data[DOMAIN][RESULTS_KEY].get(self._url)
+        if host is None:
+            self._attr_native_value = None
+        else:
+            self._attr_native_value = self.entity_description.value_fn(host)
+
+        if self.entity_description.statistics:
+            window = self.hass.data[DOMAIN][WINDOWS_KEY][self._url]
+            attributes = {
+                f"p{percent}": window.percentile(percent) for percent in PERCENTILES
+            }
+            attributes["loss_rate"] = window.loss_rate
+            attributes["samples"] = len(window)
+            self._attr_extra_state_attributes = attributes
+
+        if write:
+            self.async_write_ha_state()
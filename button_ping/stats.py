@@ -0,0 +1,60 @@
+"""Rolling latency statistics of the monitored urls."""
+from __future__ import annotations
+from array import array
+from bisect import bisect_left, insort
+import math
+
+DEFAULT_WINDOW_SIZE = 120
+
+
+class LatencyWindow:
+    """Keep the last <size> probes of an url in fixed-size ring buffers.
+
+    The RTTs are stored twice in compact arrays of doubles: in arrival order,
+    to know which sample is evicted, and sorted, so that a percentile is a
+    single index lookup instead of a sort on every read.
+    """
+
+    def __init__(self, size: int = DEFAULT_WINDOW_SIZE) -> None:
+        self._size = size
+        self._rtts = array("d", bytes(8 * size))  # Ring buffer, NaN = lost probe
+        self._sorted = array("d")  # RTTs of the window in ascending order
+        self._next = 0
+        self._count = 0
+        self._lost = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, rtt: float | None) -> None:
+        """Add a probe, None means that the packet was lost."""
+        if self._count == self._size:
+            evicted = self._rtts[self._next]
+            if math.isnan(evicted):
+                self._lost -= 1
+            else:
+                del self._sorted[bisect_left(self._sorted, evicted)]
+        else:
+            self._count += 1
+
+        if rtt is None:
+            self._rtts[self._next] = math.nan
+            self._lost += 1
+        else:
+            self._rtts[self._next] = rtt
+            insort(self._sorted, rtt)
+        self._next = (self._next + 1) % self._size
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the nearest-rank percentile of the RTTs, None without samples."""
+        if not self._sorted:
+            return None
+        rank = math.ceil(percent / 100 * len(self._sorted))
+        return self._sorted[max(rank, 1) - 1]
+
+    @property
+    def loss_rate(self) -> float | None:
+        """Return the percentage of lost probes, None without samples."""
+        if not self._count:
+            return None
+        return self._lost / self._count * 100
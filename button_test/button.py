@@ -9,6 +9,9 @@ from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 from homeassistant.components.button import ButtonEntity
 
 
+MUD_MANAGER_DOMAIN = "mud_manager"
+MUD_DOMAINS_KEY = "mud_domains"
+
 _LOGGER = logging.getLogger(__name__)
 
 def setup_platform(
@@ -30,7 +33,6 @@ class ButtonTest(ButtonEntity):
         """Initialize the button."""
         self._name = "Button Test"
         self._unique_id = "PoliTo.e-Lite.LM."+self._name
-        self.press()  # self.hass not available during init
 
     @property
     def name(self):
@@ -41,7 +43,7 @@ class ButtonTest(ButtonEntity):
     def unique_id(self) -> str | None:
         return self._unique_id
 
-    def press(self) -> None:
+    async def async_press(self) -> None:
         """Handle the button press."""
 
         _LOGGER.debug("%s pressed", self.name)
@@ -50,6 +52,13 @@ class ButtonTest(ButtonEntity):
             return
 
         integrations = self.hass.data["integrations"]
+        mud_manager = self.hass.data.get(MUD_MANAGER_DOMAIN)
+        if mud_manager is not None:
+            integrations = {
+                domain: integrations[domain]
+                for domain in mud_manager[MUD_DOMAINS_KEY](self.hass)
+                if domain in integrations
+            }
         for key, value in integrations.items():
             _LOGGER.debug("%s --- %s", key, value)
 
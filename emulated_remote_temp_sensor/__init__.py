@@ -1,3 +1,5 @@
 """ An integration that emulates a temperature sensor.
     At startup, it retrieves the last value from a web server.
     After a certain period of time, it stores its temperature on the webserver. """
+
+DOMAIN = "emulated_remote_temp_sensor"
@@ -0,0 +1,273 @@
+"""Async client used by the emulated sensors to talk with their server."""
+from __future__ import annotations
+from collections.abc import Callable
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+import asyncio
+import json
+import logging
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+
+from . import DOMAIN
+
+if TYPE_CHECKING:
+    from .writer import TemperatureWriter
+
+GET_LAST_TEMP_URL = "/api/temperatures/last"
+POST_LAST_TEMP_URL = "/api/temperatures"
+POST_BULK_TEMP_URL = "/api/temperatures/bulk"
+GET_TEMPS_SINCE_URL = "/api/temperatures"
+REQUEST_TIMEOUT = 10
+MUD_MANAGER_DOMAIN = "mud_manager"
+MUD_IS_ALLOWED_KEY = "is_allowed"
+MUD_BREAKER_KEY = "breaker"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+EPOCH = datetime.fromtimestamp(0, dt_util.UTC)
+
+
+def _parse_timestamp(timestamp: str) -> datetime | None:
+    if (time := dt_util.parse_datetime(timestamp)) is None:
+        return None
+    return dt_util.as_utc(time)
+
+
+class BulkNotSupported(Exception):
+    """The remote server does not expose the bulk endpoint."""
+
+
+class SyncNotSupported(Exception):
+    """The remote server does not expose the readings since a timestamp."""
+
+
+def async_get_api(hass: HomeAssistant, url: str) -> EmulatedRemoteTempApi:
+    """Return the client bound to <url>, creating it the first time.
+
+    All the sensors configured with the same base url share the same client,
+    the requests are sent through the Home Assistant session so that the
+    keep-alive connections towards each host are pooled and reused.
+    """
+    clients = hass.data.setdefault(DOMAIN, {})
+    if url not in clients:
+        clients[url] = EmulatedRemoteTempApi(hass, async_get_clientsession(hass), url)
+    return clients[url]
+
+
+class EmulatedRemoteTempApi:
+    """Client of the REST server storing the emulated temperatures."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: aiohttp.ClientSession,
+        url: str,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> None:
+        self._hass = hass
+        self._session = session
+        self._url = url
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._pending_last: asyncio.Future[dict[str, Any] | None] | None = None
+        # Transfer of the readings since a timestamp, shared by the sensors
+        self._pending_since: asyncio.Future[bool] | None = None
+        self._since_started = False
+        self._since_readers: list[tuple[datetime | None, str, Callable[[float, str], None]]] = []
+        # Shared by all the entities connecting to the host, see mud_manager
+        self.breaker = hass.data[MUD_MANAGER_DOMAIN][MUD_BREAKER_KEY](hass, url)
+        self._mud_is_allowed = hass.data[MUD_MANAGER_DOMAIN][MUD_IS_ALLOWED_KEY]
+        # Write-behind queue of the readings, see writer.async_get_writer
+        self.writer: TemperatureWriter | None = None
+
+    @property
+    def url(self) -> str:
+        """Base url of the remote server."""
+        return self._url
+
+    async def async_get_last_reading(self) -> dict[str, Any] | None:
+        """Retrieve the last stored {"value": x, "timestamp": y} reading.
+
+        None is returned if it is not available, an empty dict if the server
+        stores no temperature. The sensors bound to the same server share the
+        same value: concurrent callers wait for the request already in flight
+        instead of sending a new one, so N sensors starting together cost a
+        single GET.
+        """
+        if self._pending_last is None:
+            self._pending_last = asyncio.ensure_future(self._async_fetch_last_temperature())
+            self._pending_last.add_done_callback(self._clear_pending_last)
+        return await asyncio.shield(self._pending_last)
+
+    def _clear_pending_last(self, _: asyncio.Future) -> None:
+        self._pending_last = None
+
+    def _allow_request(self) -> bool:
+        """Check the MUD file and the circuit breaker before contacting the server."""
+        if not self._mud_is_allowed(self._hass, DOMAIN, self._url):
+            return False
+        if not self.breaker.allow_request():
+            _LOGGER.debug("<%s> is unreachable, request skipped", self._url)
+            return False
+        return True
+
+    def _log_connection_error(self, ex: Exception) -> None:
+        self.breaker.record_failure()
+        if self.breaker.is_open:  # Already reported by the breaker
+            _LOGGER.debug("Error contacting <%s>: %s", self._url, ex)
+        else:
+            _LOGGER.error("Error contacting <%s>: %s", self._url, ex)
+
+    async def _async_fetch_last_temperature(self) -> dict[str, Any] | None:
+        if not self._allow_request():
+            return None
+        try:
+            async with self._session.get(
+                self._url + GET_LAST_TEMP_URL, timeout=self._timeout
+            ) as response:
+                self.breaker.record_status(response.status)
+                if response.status == 404:
+                    return {}
+                if response.status != 200:
+                    _LOGGER.error("Impossible to retrieve temperature!")
+                    return None
+                value = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            self._log_connection_error(ex)
+            return None
+        except ValueError as ex:
+            _LOGGER.error("Error parsing json object: %s", ex)
+            return None
+
+        if isinstance(value, dict) and value.get("value") is not None:
+            return value
+        return None
+
+    async def async_post_temperature(self, value: float, timestamp: str | None = None) -> bool:
+        """Store a new temperature on the remote server, read at <timestamp> if given."""
+        if not self._allow_request():
+            return False
+        body: dict[str, Any] = {"value": value}
+        if timestamp is not None:
+            body["timestamp"] = timestamp
+        try:
+            async with self._session.post(
+                self._url + POST_LAST_TEMP_URL,
+                json=body,
+                timeout=self._timeout,
+            ) as response:
+                self.breaker.record_status(response.status)
+                if response.status == 200:
+                    return True
+                error = await response.json(content_type=None)
+                _LOGGER.error("Error storing temperature: %s", error["error"])
+                return False
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            self._log_connection_error(ex)
+            return False
+        except (ValueError, KeyError, TypeError) as ex:
+            _LOGGER.error("Error parsing json object: %s", ex)
+            return False
+
+    async def async_post_temperatures(self, readings: list[dict[str, Any]]) -> bool:
+        """Store many {"value": x, "timestamp": y} readings with a single request.
+
+        BulkNotSupported is raised if the endpoint does not exist.
+        """
+        if not self._allow_request():
+            return False
+        try:
+            async with self._session.post(
+                self._url + POST_BULK_TEMP_URL,
+                json=readings,
+                timeout=self._timeout,
+            ) as response:
+                self.breaker.record_status(response.status)
+                if response.status in (404, 405, 501):
+                    raise BulkNotSupported(self._url)
+                if response.status == 200:
+                    return True
+                error = await response.json(content_type=None)
+                _LOGGER.error("Error storing temperatures: %s", error["error"])
+                return False
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            self._log_connection_error(ex)
+            return False
+        except (ValueError, KeyError, TypeError) as ex:
+            _LOGGER.error("Error parsing json object: %s", ex)
+            return False
+
+    async def async_get_temperatures_since(
+        self, since: str, on_reading: Callable[[float, str], None]
+    ) -> bool:
+        """Retrieve the readings stored after <since>.
+
+        The server answers with one {"value": x, "timestamp": y} object per
+        line (NDJSON), oldest first: the lines are parsed while they are
+        received and passed to <on_reading>, so that the readings are never
+        all in memory. False is returned if the transfer did not complete,
+        SyncNotSupported is raised if the endpoint does not exist.
+
+        The sensors bound to the same server share the transfer: the callers
+        arriving before the request is sent join it, it starts from the oldest
+        <since> and each of them receives only the readings after its own.
+        """
+        while self._pending_since is not None and self._since_started:
+            # Too late to join, waiting for the transfer to complete
+            await asyncio.wait([self._pending_since])
+        if self._pending_since is None:
+            self._since_readers = []
+            self._since_started = False
+            self._pending_since = asyncio.ensure_future(self._async_fetch_since())
+        self._since_readers.append((_parse_timestamp(since), since, on_reading))
+        return await asyncio.shield(self._pending_since)
+
+    async def _async_fetch_since(self) -> bool:
+        try:
+            return await self._async_stream_since()
+        finally:
+            self._pending_since = None
+
+    async def _async_stream_since(self) -> bool:
+        await asyncio.sleep(0)  # Letting the sensors starting together join
+        self._since_started = True
+        if not self._allow_request():
+            return False
+        readers = self._since_readers
+        _, since, _ = min(readers, key=lambda reader: reader[0] or EPOCH)
+        params = {"since": since}
+        try:
+            async with self._session.get(
+                self._url + GET_TEMPS_SINCE_URL,
+                params=params,
+                # The transfer may be long, only the silences are timed out
+                timeout=aiohttp.ClientTimeout(sock_read=self._timeout.total),
+            ) as response:
+                self.breaker.record_status(response.status)
+                if response.status in (404, 405, 501):
+                    raise SyncNotSupported(self._url)
+                if response.status != 200:
+                    _LOGGER.error("Impossible to retrieve the temperatures since <%s>", since)
+                    return False
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    try:
+                        reading = json.loads(line)
+                        value, timestamp = float(reading["value"]), reading["timestamp"]
+                        time = _parse_timestamp(timestamp)
+                    except (ValueError, KeyError, TypeError) as ex:
+                        _LOGGER.warning("Skipping an invalid reading: %s", ex)
+                        continue
+                    for reader_since, _, on_reading in readers:
+                        if time is None or reader_since is None or time > reader_since:
+                            on_reading(value, timestamp)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            self._log_connection_error(ex)
+            return False
+        return True
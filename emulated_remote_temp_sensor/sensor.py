@@ -1,26 +1,40 @@
 """Platform for sensor integration."""
 from __future__ import annotations
-from typing import Final
-from random import randint
+from datetime import datetime
+from datetime import timedelta
+from typing import Any, Final
+import asyncio
 import logging
-import requests
 
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.const import TEMP_CELSIUS
+import numpy as np
+
+from homeassistant.components.recorder.statistics import async_import_statistics
+from homeassistant.components.sensor import SCAN_INTERVAL, SensorEntity, SensorStateClass
+from homeassistant.const import CONF_SCAN_INTERVAL, TEMP_CELSIUS
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+from homeassistant.util import dt as dt_util
+
+from . import DOMAIN
+from .api import EmulatedRemoteTempApi, SyncNotSupported, async_get_api
+from .writer import async_get_writer
 
 MIN_TEMP_KEY = "min_temp"
 MAX_TEMP_KEY = "max_temp"
 NAME_KEY = "name"
 URL_KEY = "url"
+STARTUP_TIMEOUT_KEY = "startup_timeout"
+SEED_KEY = "seed"
+MODEL_KEY = "model"
 DEFAULT_NAME = "Emulated Remote Temperature Sensor"
-DOMAIN = "emulated_temp_sensor"
 DEFAULT_MIN_TEMP = 18
 DEFAULT_MAX_TEMP = 30
-GET_LAST_TEMP_URL = "/api/temperatures/last"
-POST_LAST_TEMP_URL = "/api/temperatures"
+DEFAULT_STARTUP_TIMEOUT = 10
+ATTR_LAST_TIMESTAMP = "last_timestamp"
+TEMP_SENSOR_DOMAIN = "emulated_temp_sensor"
+TEMP_SENSOR_CREATE_MODEL_KEY = "create_model"
 
 
 # Work but does not support scan_interval
@@ -41,13 +55,28 @@ POST_LAST_TEMP_URL = "/api/temperatures"
     - platform: emulated_temp_sensor
       scan_interval: 300  // number of seconds that will trigger an update
       url: localhost      // "host.docker.internal" if the integration is running in a container
+      startup_timeout: 10 // optional, seconds to wait for the last temperature before going unavailable
+      seed: 42            // optional, makes the temperatures reproducible
+      model:              // optional, a signal model of emulated_temp_sensor
+        type: ornstein_uhlenbeck
+
+    The temperatures are sent in batches to /api/temperatures/bulk (one by one if the
+    server does not support it); while the server is down they are kept on disk.
+
+    At startup the sensor restores its last temperature, then it retrieves only the
+    readings stored since the last one it saw (/api/temperatures?since=<timestamp>),
+    importing them in the long term statistics of Home Assistant. Without a restored
+    timestamp it starts from the last temperature (/api/temperatures/last).
+
+    The emulated temperature is generated by the signal models of emulated_temp_sensor
+    (a random walk by default), bounded by min_temp and max_temp.
 """
 _LOGGER = logging.getLogger(__name__)
 
-def setup_platform(
+async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
-    add_entities: AddEntitiesCallback,
+    async_add_entities: AddEntitiesCallback,
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up the sensor platform."""
@@ -68,29 +97,183 @@ def setup_platform(
         url = config[URL_KEY]
     else:
         url = "localhost"
+    if STARTUP_TIMEOUT_KEY in config:
+        startup_timeout = config[STARTUP_TIMEOUT_KEY]
+    else:
+        startup_timeout = DEFAULT_STARTUP_TIMEOUT
+    if SEED_KEY in config:
+        seed = int(config[SEED_KEY])
+    else:
+        seed = None
+    if MODEL_KEY in config:
+        model_config = config[MODEL_KEY]
+    else:
+        model_config = None
+    if CONF_SCAN_INTERVAL in config:
+        scan_interval = config[CONF_SCAN_INTERVAL]
+    else:
+        scan_interval = SCAN_INTERVAL
+
+    create_model = hass.data[TEMP_SENSOR_DOMAIN][TEMP_SENSOR_CREATE_MODEL_KEY]
+    try:
+        model = await hass.async_add_executor_job(create_model, model_config)
+    except ValueError as ex:
+        _LOGGER.error("Invalid configuration of <%s>: %s", name, ex)
+        return
 
-    add_entities([EmulatedRemoteTempSensor(name=name, min_temp=min_temp, max_temp=max_temp, url=url)])
+    api = async_get_api(hass, url)
+    async_add_entities([EmulatedRemoteTempSensor(api=api, name=name, min_temp=min_temp, max_temp=max_temp, startup_timeout=startup_timeout, seed=seed, model=model, scan_interval=scan_interval)])
 
 
-class EmulatedRemoteTempSensor(SensorEntity):
+class EmulatedRemoteTempSensor(SensorEntity, RestoreEntity):
     """Representation of a Sensor. Extends Restore Entity to retrieve last temperature value."""
 
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
     def __init__(
-        self, name:str=DEFAULT_NAME, min_temp:int=DEFAULT_MIN_TEMP, max_temp:int=DEFAULT_MAX_TEMP, url:str="localhost"
+        self, api: EmulatedRemoteTempApi, name:str=DEFAULT_NAME, min_temp:int=DEFAULT_MIN_TEMP, max_temp:int=DEFAULT_MAX_TEMP,
+        startup_timeout:float=DEFAULT_STARTUP_TIMEOUT, seed:int|None=None, model:Any=None,
+        scan_interval:timedelta=SCAN_INTERVAL
     ) -> None:
         """Initialize the sensor."""
         self._sensor_name = name
         self._unique_id = "PoliTo.e-Lite.LM."+self._sensor_name
         self._MIN_TMP: Final[int] = min_temp
         self._MAX_TMP: Final[int] = max_temp
-        self._url = url
-        last_temp = self.get_last_temperature()
-        if last_temp:
-            self._state = last_temp
-        else:
-            _LOGGER.critical("Error retriving last temperature from remote server! Temperature randomly generated!")
+        self._api = api
+        self._url = api.url
+        self._startup_timeout = startup_timeout
+        # A signal model of emulated_temp_sensor, see its models.py
+        self._model = model
+        self._rng = np.random.default_rng(seed)
+        self._scan_interval = scan_interval
+        self._ticks = 0
+        self._state = None
+        # Timestamp of the last reading stored on the server
+        self._last_timestamp: str | None = None
+        self._synced = False
+        self._syncing = False
+        # Hour -> [min, max, sum, count] of the readings retrieved by the sync
+        self._hours: dict[datetime, list[float]] = {}
+        # Unavailable until the initial temperature is known
+        self._attr_available = False
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last temperature, then synchronize in background without blocking the startup."""
+        last_state = await self.async_get_last_state()
+        if last_state is not None:
+            try:
+                self._state = float(last_state.state)
+                self._attr_available = True
+            except ValueError:  # unknown or unavailable
+                pass
+            self._last_timestamp = last_state.attributes.get(ATTR_LAST_TIMESTAMP)
+        self.hass.async_create_task(self.async_sync())
+
+    async def async_sync(self) -> None:
+        """Retrieve the readings stored on the remote server since the last one seen.
+
+        If the server does not answer within startup_timeout seconds the sensor
+        keeps its restored temperature (or stays unavailable), and the sync is
+        retried at the next update starting from the last reading received.
+        """
+        if self._syncing:  # Already in progress
+            return
+        self._syncing = True
+        try:
+            synced = await asyncio.wait_for(self._async_catch_up(), self._startup_timeout)
+        except asyncio.TimeoutError:
+            _LOGGER.warning(
+                "<%s> did not complete the sync within %s seconds, <%s> will retry",
+                self._url, self._startup_timeout, self._sensor_name
+            )
+            synced = False
+        finally:
+            self._syncing = False
+        self._async_import_statistics(synced)
+        if not synced:
+            self.async_write_ha_state()
+            return
+
+        if self._state is None:  # Nothing restored and nothing stored on the server
+            _LOGGER.warning("No temperature stored on the remote server, starting from a random one")
             self._state = self.random_temp()
         _LOGGER.debug("Initial temperature value: %.2f", self._state)
+        self._synced = True
+        self._attr_available = True
+        self.async_write_ha_state()
+
+    async def _async_catch_up(self) -> bool:
+        if self._last_timestamp is None:  # Not the history, only where to resume from
+            return await self._async_get_last_reading()
+        try:
+            return await self._api.async_get_temperatures_since(
+                self._last_timestamp, self._add_reading
+            )
+        except SyncNotSupported:
+            _LOGGER.info("<%s> does not support the sync, retrieving the last temperature", self._url)
+        return await self._async_get_last_reading()
+
+    async def _async_get_last_reading(self) -> bool:
+        reading = await self._api.async_get_last_reading()
+        if reading is None:
+            return False
+        if reading:  # Empty if the server stores no temperature
+            self._state = reading["value"]
+            self._last_timestamp = reading.get("timestamp", self._last_timestamp)
+        return True
+
+    def _add_reading(self, value: float, timestamp: str) -> None:
+        self._state = value
+        self._last_timestamp = timestamp
+        if (time := dt_util.parse_datetime(timestamp)) is None:
+            return
+        hour = dt_util.as_utc(time).replace(minute=0, second=0, microsecond=0)
+        if (stats := self._hours.get(hour)) is None:
+            self._hours[hour] = [value, value, value, 1]
+        else:
+            stats[0] = min(stats[0], value)
+            stats[1] = max(stats[1], value)
+            stats[2] += value
+            stats[3] += 1
+
+    def _async_import_statistics(self, complete: bool) -> None:
+        """Import the hourly statistics of the readings retrieved, in a single batch.
+
+        The current hour is left to the recorder, which compiles it from the states;
+        if the sync did not complete, the hour of the last reading is kept until
+        its remaining readings are retrieved.
+        """
+        if complete:
+            last_hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        elif self._hours:
+            last_hour = max(self._hours)
+        else:
+            return
+        hours = sorted(hour for hour in self._hours if hour < last_hour)
+        if not hours or "recorder" not in self.hass.config.components:
+            return
+        statistics = [
+            {
+                "start": hour,
+                "min": self._hours[hour][0],
+                "max": self._hours[hour][1],
+                "mean": self._hours[hour][2] / self._hours[hour][3],
+            }
+            for hour in hours
+        ]
+        metadata = {
+            "has_mean": True,
+            "has_sum": False,
+            "name": self._sensor_name,
+            "source": "recorder",
+            "statistic_id": self.entity_id,
+            "unit_of_measurement": TEMP_CELSIUS,
+        }
+        async_import_statistics(self.hass, metadata, statistics)
+        for hour in hours:
+            del self._hours[hour]
+        _LOGGER.info("%d hours of temperatures imported for <%s>", len(hours), self.entity_id)
 
     @property
     def name(self) -> str:
@@ -101,66 +284,51 @@ class EmulatedRemoteTempSensor(SensorEntity):
     def unique_id(self) -> str | None:
         return self._unique_id
 
+    @property
+    def available(self) -> bool:
+        """Unavailable until the initial temperature is known, and while the server is unreachable."""
+        return self._attr_available and not self._api.breaker.is_open
+
     @property
     def state(self):
         """Return the state of the sensor."""
         return self._state
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the timestamp of the last reading, restored to resume the sync."""
+        return {ATTR_LAST_TIMESTAMP: self._last_timestamp}
+
     @property
     def unit_of_measurement(self) -> str:
         """Return the unit of measurement."""
         return TEMP_CELSIUS
 
-    def get_last_temperature(self) -> float | None:
-        url = self._url+GET_LAST_TEMP_URL
-        response = requests.get(url, allow_redirects=True)
-        if response.status_code != 200:
-            _LOGGER.error("Impossible to retrieve temperature!")
-            return None
-        else:
-            try:
-                value = response.json()
-                if value and value["value"]:
-                    return value["value"]
-                else:
-                    return None
-            except Exception as ex:
-                _LOGGER.error("Error parsing json object: %s", ex)
-                return None
-
-    def post_last_temperature(self) -> bool:
-        url = self._url+POST_LAST_TEMP_URL
-        response = requests.post(url, json={"value": self._state})
-        if response.status_code == 200:
-            return True
-        else:
-            _LOGGER.error("Error storing temperature: %s", response.json()["error"])
-            return False
-
     def random_temp(self) -> float:
-        integer = randint(self._MIN_TMP, self._MAX_TMP - 1)
-        mantissa = randint(0, 9)
-        temp = float(str(integer) + "." + str(mantissa))
-        return temp
+        return self._model.initial_value(self._rng, self._MIN_TMP, self._MAX_TMP)
 
-    def update(self) -> None:
+    async def async_update(self) -> None:
         """Fetch new state data for the sensor.
 
         This is the only method that should fetch new data for Home Assistant.
         """
+        if not self._synced:
+            # The server missed the startup deadline, trying again
+            await self.async_sync()
+            return
+
         # Emulating a call to a remote server
         # self._remote_server_call()
 
-        diff = float("0." + str(randint(0, 9)))
-        case = randint(0, 2)
-        if case == 0:
-            pass
-        elif case == 1:
-            self._state = self._state - diff
-        elif case == 2:
-            self._state = self._state + diff
-
-        if self.post_last_temperature():
-            _LOGGER.debug("Temperature succesfully updated (%.2f)", self._state)
-        else:
-            _LOGGER.error("Impossible to store temperature on remote server: <%s>", self._url)
+        if self._model.needs_prefetch:
+            await self.hass.async_add_executor_job(self._model.prefetch)
+        self._ticks += 1
+        elapsed = self._ticks * self._scan_interval.total_seconds()
+        low, high = np.array([self._MIN_TMP], float), np.array([self._MAX_TMP], float)
+        values = self._model.step(self._rng, elapsed, np.array([self._state], float), low, high)
+        self._state = float(np.clip(values, low, high).round(1)[0])
+
+        # Sent in background with the readings of the other sensors of the server
+        self._last_timestamp = dt_util.utcnow().isoformat()
+        await async_get_writer(self.hass, self._api).async_enqueue(self._state, self._last_timestamp)
+        _LOGGER.debug("Temperature queued (%.2f)", self._state)
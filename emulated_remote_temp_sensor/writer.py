@@ -0,0 +1,156 @@
+"""Write-behind queue of the temperatures sent to the remote servers."""
+from __future__ import annotations
+from collections import deque
+from typing import Any
+import asyncio
+import itertools
+import logging
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from . import DOMAIN
+from .api import BulkNotSupported, EmulatedRemoteTempApi
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+BUFFER_SIZE = 1000  # Readings queued before the sensors wait
+FLUSH_BATCH_SIZE = 100
+FLUSH_INTERVAL = 5  # Seconds waited to fill a batch
+MAX_SPILLED = 100000
+SPILL_CHUNKS_PER_FLUSH = 5  # Chunks of spilled readings sent after each batch
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def async_get_writer(hass: HomeAssistant, api: EmulatedRemoteTempApi) -> TemperatureWriter:
+    """Return the writer of the server of <api>, creating it the first time."""
+    if api.writer is None:
+        api.writer = TemperatureWriter(hass, api)
+    return api.writer
+
+
+class TemperatureWriter:
+    """Collect the readings of all the sensors of a server and send them in batches.
+
+    A batch is sent as soon as it holds FLUSH_BATCH_SIZE readings, or
+    FLUSH_INTERVAL seconds after its first reading. The buffer is bounded:
+    when the server is slower than the sensors, the sensors wait. The batches
+    that cannot be delivered are spilled to disk and sent again, oldest first,
+    when the server is back (also after a restart): at most
+    SPILL_CHUNKS_PER_FLUSH chunks after each batch, so that the new readings
+    do not wait for the whole backlog.
+    """
+
+    def __init__(self, hass: HomeAssistant, api: EmulatedRemoteTempApi) -> None:
+        self._hass = hass
+        self._api = api
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(BUFFER_SIZE)
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.spill.{slugify(api.url)}"
+        )
+        self._spilled: deque[dict[str, Any]] = deque()
+        self._spill_loaded = False
+        # Readings of the current batch not delivered yet
+        self._in_flight: deque[dict[str, Any]] = deque()
+        self._bulk_supported = True
+        self._task: asyncio.Task | None = None
+
+    async def async_enqueue(self, value: float, timestamp: str) -> None:
+        """Queue a reading, waiting if the buffer is full."""
+        if self._task is None:
+            self._task = self._hass.async_create_task(self._async_run())
+            self._hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_stop)
+        await self._queue.put({"value": value, "timestamp": timestamp})
+
+    async def _async_load_spilled(self) -> None:
+        if not self._spill_loaded:
+            self._spilled.extendleft(reversed(await self._store.async_load() or []))
+            self._spill_loaded = True
+
+    async def _async_run(self) -> None:
+        await self._async_load_spilled()
+        if self._spilled:
+            _LOGGER.info("%d readings for <%s> restored from disk", len(self._spilled), self._api.url)
+        loop = self._hass.loop
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + FLUSH_INTERVAL
+            while len(batch) < FLUSH_BATCH_SIZE:
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), deadline - loop.time())
+                    )
+                except asyncio.TimeoutError:
+                    break
+            self._in_flight.extend(batch)
+            await self._async_flush()
+
+    async def _async_flush(self) -> None:
+        """Send the batch in flight, then a few chunks of the spilled readings.
+
+        What was not delivered is spilled.
+        """
+        spilled_before = len(self._spilled)
+        if await self._async_send(self._in_flight):
+            for _ in range(SPILL_CHUNKS_PER_FLUSH):
+                if not self._spilled or not await self._async_send(self._spilled):
+                    break
+            if spilled_before and not self._spilled:
+                _LOGGER.info("Readings spilled for <%s> delivered", self._api.url)
+        elif not spilled_before:
+            _LOGGER.warning("<%s> is unreachable, spilling the readings to disk", self._api.url)
+
+        self._spilled.extend(self._in_flight)
+        self._in_flight.clear()
+        self._trim_spilled()
+        if self._spilled or spilled_before:
+            self._store.async_delay_save(lambda: list(self._spilled), SAVE_DELAY)
+
+    def _trim_spilled(self) -> None:
+        if (excess := len(self._spilled) - MAX_SPILLED) > 0:
+            _LOGGER.error("Dropping the %d oldest readings for <%s>", excess, self._api.url)
+            for _ in range(excess):
+                self._spilled.popleft()
+
+    async def _async_send(self, readings: deque[dict[str, Any]]) -> bool:
+        """Send the first FLUSH_BATCH_SIZE <readings>, removing the delivered ones.
+
+        Return True if all of them were delivered.
+        """
+        chunk = list(itertools.islice(readings, FLUSH_BATCH_SIZE))
+        if self._bulk_supported:
+            try:
+                if not await self._api.async_post_temperatures(chunk):
+                    return False
+                for _ in chunk:
+                    readings.popleft()
+                return True
+            except BulkNotSupported:
+                _LOGGER.info("<%s> has no bulk endpoint, sending one reading at a time", self._api.url)
+                self._bulk_supported = False
+        for reading in chunk:
+            if not await self._api.async_post_temperature(
+                reading["value"], reading["timestamp"]
+            ):
+                return False
+            readings.popleft()
+        return True
+
+    async def _async_stop(self, event: Event) -> None:
+        """Spill the queued readings, so that they are sent after the restart."""
+        if self._task is not None:
+            self._task.cancel()
+        # Not to overwrite the readings spilled before the restart
+        await self._async_load_spilled()
+        # Only the readings of the batch in flight that were not delivered
+        pending = len(self._in_flight) + self._queue.qsize()
+        self._spilled.extend(self._in_flight)
+        self._in_flight.clear()
+        while not self._queue.empty():
+            self._spilled.append(self._queue.get_nowait())
+        if pending:
+            self._trim_spilled()
+            await self._store.async_save(list(self._spilled))
@@ -1,3 +1,20 @@
-"""An integration that emulates a temperature sensor."""
+"""An integration that emulates a temperature sensor.
+
+The signal models are shared with the other integrations emulating a
+temperature: they find models.create_model in
+hass.data["emulated_temp_sensor"]["create_model"].
+"""
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.typing import ConfigType
+
+from .models import create_model
 
 DOMAIN = "emulated_temp_sensor"
+ENGINES_KEY = "engines"
+CREATE_MODEL_KEY = "create_model"
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Expose the signal models to the other integrations."""
+    hass.data[DOMAIN] = {ENGINES_KEY: {}, CREATE_MODEL_KEY: create_model}
+    return True
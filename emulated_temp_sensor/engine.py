@@ -0,0 +1,147 @@
+"""Advance the temperatures of all the emulated sensors in a single NumPy step."""
+from __future__ import annotations
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+import logging
+import time
+
+import numpy as np
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from . import DOMAIN, ENGINES_KEY
+from .models import SignalModel, create_model
+
+if TYPE_CHECKING:
+    from .sensor import EmulatedTempSensor
+
+INITIAL_CAPACITY = 64
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_get_engine(
+    hass: HomeAssistant,
+    interval: timedelta,
+    model_config: dict[str, Any] | None = None,
+    seed: int | None = None,
+) -> EmulationEngine:
+    """Return the engine of the sensors updated every <interval> with the same model.
+
+    ValueError is raised if the model is not valid.
+    """
+    engines = hass.data[DOMAIN][ENGINES_KEY]
+    key = (interval, repr(sorted((model_config or {}).items())), seed)
+    if key not in engines:
+        model = await hass.async_add_executor_job(create_model, model_config)
+        engines.setdefault(key, EmulationEngine(hass, interval, model, seed))
+    return engines[key]
+
+
+class EmulationEngine:
+    """Keep the temperatures of the emulated sensors in one array.
+
+    At every tick the model computes the temperatures of all the sensors,
+    which are clamped to the bounds of each sensor; only the sensors whose
+    temperature (rounded to one decimal digit) changed are written.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        interval: timedelta,
+        model: SignalModel,
+        seed: int | None = None,
+    ) -> None:
+        self._hass = hass
+        self._interval = interval
+        self._model = model
+        self._rng = np.random.default_rng(seed)
+        self.seeded = seed is not None
+        self._ticks = 0
+        self._stepping = False
+        self._size = 0
+        self._values = np.zeros(INITIAL_CAPACITY)
+        self._low = np.zeros(INITIAL_CAPACITY)
+        self._high = np.zeros(INITIAL_CAPACITY)
+        self._entities: list[EmulatedTempSensor] = []
+        self._unsub_timer: CALLBACK_TYPE | None = None
+
+    def initial_value(self, low: float, high: float) -> float:
+        """Return the starting temperature of a new sensor."""
+        return self._model.initial_value(self._rng, low, high)
+
+    @callback
+    def async_add(
+        self, entity: EmulatedTempSensor, value: float, low: float, high: float
+    ) -> CALLBACK_TYPE:
+        """Add a sensor to the engine, return the callback removing it."""
+        if self._size == len(self._values):
+            capacity = 2 * len(self._values)
+            self._values = np.resize(self._values, capacity)
+            self._low = np.resize(self._low, capacity)
+            self._high = np.resize(self._high, capacity)
+        index = self._size
+        self._values[index] = value
+        self._low[index] = low
+        self._high[index] = high
+        self._entities.append(entity)
+        self._size += 1
+
+        if self._unsub_timer is None:
+            self._unsub_timer = async_track_time_interval(
+                self._hass, self._async_step, self._interval
+            )
+
+        @callback
+        def _async_remove() -> None:
+            self._async_remove(entity)
+
+        return _async_remove
+
+    @callback
+    def _async_remove(self, entity: EmulatedTempSensor) -> None:
+        # The last sensor takes the place of the removed one
+        index = self._entities.index(entity)
+        last = self._size - 1
+        self._values[index] = self._values[last]
+        self._low[index] = self._low[last]
+        self._high[index] = self._high[last]
+        self._entities[index] = self._entities[last]
+        self._entities.pop()
+        self._size = last
+
+        if self._size == 0 and self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    async def _async_step(self, now: datetime | None = None) -> None:
+        if self._stepping:  # The trace is slower than the interval
+            _LOGGER.debug("Previous step still running, skipping this one")
+            return
+        if self._model.needs_prefetch:
+            self._stepping = True
+            try:
+                await self._hass.async_add_executor_job(self._model.prefetch)
+            finally:
+                self._stepping = False
+
+        start = time.perf_counter()
+        size = self._size
+        values = self._values[:size]
+        low, high = self._low[:size], self._high[:size]
+        previous = values.round(1)
+        self._ticks += 1
+        elapsed = self._ticks * self._interval.total_seconds()
+        np.clip(self._model.step(self._rng, elapsed, values, low, high), low, high, out=values)
+
+        current = values.round(1)
+        changed = np.flatnonzero(current != previous)
+        for index, value in zip(changed.tolist(), current[changed].tolist()):
+            self._entities[index].async_set_temperature(value)
+
+        _LOGGER.debug(
+            "%d emulated temperatures updated (%d changed) in %.1f ms",
+            size, len(changed), (time.perf_counter() - start) * 1000,
+        )
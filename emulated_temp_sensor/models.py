@@ -0,0 +1,215 @@
+"""Signal models generating the temperatures of the emulated sensors.
+
+A model advances the temperatures of all the sensors of an engine in one
+vectorized step, drawing from the numpy Generator of the engine: with the
+same seed and configuration two runs produce the same values (the
+sinusoidal model follows the clock unless "clock" is false).
+
+    model:
+      type: ornstein_uhlenbeck  // random_walk, sinusoidal, ornstein_uhlenbeck or replay
+      theta: 0.05
+      sigma: 0.2
+
+The replay model reads a trace (.csv, .npy or .parquet) one row per tick,
+sensor i taking column i modulo the number of columns. The trace is memory
+mapped, so it is never loaded in memory: PREFETCH_ROWS rows at a time are
+read ahead in the executor. Parquet traces need pyarrow.
+"""
+from __future__ import annotations
+from collections import deque
+from collections.abc import Iterator
+from typing import Any
+import itertools
+import math
+import mmap
+import os
+
+import numpy as np
+
+from homeassistant.util import dt as dt_util
+
+MODEL_TYPE_KEY = "type"
+RANDOM_WALK = "random_walk"
+SINUSOIDAL = "sinusoidal"
+ORNSTEIN_UHLENBECK = "ornstein_uhlenbeck"
+REPLAY = "replay"
+
+PARQUET_BATCH_SIZE = 4096
+PREFETCH_ROWS = 1024
+
+
+class SignalModel:
+    """Base class of the signal models: a bounded random walk."""
+
+    # True when prefetch must run before the next step
+    needs_prefetch = False
+
+    def prefetch(self) -> None:
+        """Read the data of the next steps, this method does I/O."""
+
+    def initial_value(self, rng: np.random.Generator, low: float, high: float) -> float:
+        """Return a random starting temperature, with one decimal digit."""
+        return float(rng.integers(low, high)) + float(rng.integers(0, 10)) / 10
+
+    def step(
+        self,
+        rng: np.random.Generator,
+        elapsed: float,
+        values: np.ndarray,
+        low: np.ndarray,
+        high: np.ndarray,
+    ) -> np.ndarray:
+        """Return the next temperatures, the engine clamps them to [low, high].
+
+        <elapsed> is the emulated time in seconds, i.e. ticks * scan_interval.
+        """
+        size = len(values)
+        # -1, 0 or +1 times 0.0-0.9 degrees
+        return values + rng.integers(-1, 2, size) * (rng.integers(0, 10, size) / 10)
+
+
+class SinusoidalModel(SignalModel):
+    """Day/night cycle between the bounds, plus noise.
+
+    With the default period the temperatures are the lowest at 4 and the
+    highest at 16, local time. When <clock> is false the cycle starts with
+    the engine instead, so that seeded runs are identical.
+    """
+
+    def __init__(self, period: float = 86400, noise: float = 0.1, clock: bool = True) -> None:
+        self._period = float(period)
+        self._noise = float(noise)
+        self._clock = bool(clock)
+
+    def step(self, rng, elapsed, values, low, high):
+        if self._clock:
+            now = dt_util.now()
+            # Seconds since the local midnight of the epoch
+            elapsed = now.timestamp() + now.utcoffset().total_seconds()
+        middle = (low + high) / 2
+        amplitude = (high - low) / 2
+        angle = 2 * math.pi * (elapsed - self._period / 6) / self._period
+        return (
+            middle
+            - amplitude * math.cos(angle)
+            + self._noise * rng.standard_normal(len(values))
+        )
+
+
+class OrnsteinUhlenbeckModel(SignalModel):
+    """Mean reverting noise around <mean> (the middle of the bounds by default)."""
+
+    def __init__(
+        self, theta: float = 0.05, sigma: float = 0.2, mean: float | None = None
+    ) -> None:
+        self._theta = float(theta)
+        self._sigma = float(sigma)
+        self._mean = mean
+
+    def step(self, rng, elapsed, values, low, high):
+        mean = (low + high) / 2 if self._mean is None else self._mean
+        return (
+            values
+            + self._theta * (mean - values)
+            + self._sigma * rng.standard_normal(len(values))
+        )
+
+
+class ReplayModel(SignalModel):
+    """Replay a recorded trace, looping at its end."""
+
+    def __init__(self, path: str) -> None:
+        """Open the trace, this method does I/O."""
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            self._rows = _iter_csv(path)
+        elif extension == ".npy":
+            self._rows = _iter_npy(path)
+        elif extension == ".parquet":
+            self._rows = _iter_parquet(path)
+        else:
+            raise ValueError(f"Unsupported trace format <{extension}>")
+        self._buffer: deque[np.ndarray] = deque()
+        # Reading the first rows now, so a broken trace fails the setup
+        self.prefetch()
+
+    @property
+    def needs_prefetch(self) -> bool:
+        return not self._buffer
+
+    def prefetch(self) -> None:
+        self._buffer.extend(itertools.islice(self._rows, PREFETCH_ROWS - len(self._buffer)))
+
+    def step(self, rng, elapsed, values, low, high):
+        row = self._buffer.popleft()
+        return row[np.arange(len(values)) % len(row)]
+
+
+def _iter_csv(path: str) -> Iterator[np.ndarray]:
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as trace:
+        rows = 0
+        while True:
+            line = trace.readline()
+            if not line:
+                if rows == 0:
+                    raise ValueError(f"No numeric rows in <{path}>")
+                trace.seek(0)
+                continue
+            try:
+                row = np.array([float(value) for value in line.split(b",")])
+            except ValueError:  # Header or malformed line
+                continue
+            rows += 1
+            yield row
+
+
+def _iter_npy(path: str) -> Iterator[np.ndarray]:
+    trace = np.load(path, mmap_mode="r")
+    if trace.ndim == 1:
+        trace = trace.reshape(-1, 1)
+    if len(trace) == 0:
+        raise ValueError(f"Empty trace <{path}>")
+    while True:
+        for row in trace:
+            yield np.asarray(row, dtype=float)
+
+
+def _iter_parquet(path: str) -> Iterator[np.ndarray]:
+    try:
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+    except ImportError as ex:
+        raise ValueError("pyarrow is needed to replay parquet traces") from ex
+
+    trace = pq.ParquetFile(path, memory_map=True)
+    if trace.metadata.num_rows == 0:
+        raise ValueError(f"Empty trace <{path}>")
+    while True:
+        for batch in trace.iter_batches(batch_size=PARQUET_BATCH_SIZE):
+            columns = [column.to_numpy(zero_copy_only=False) for column in batch.columns]
+            yield from np.column_stack(columns).astype(float)
+
+
+MODELS = {
+    RANDOM_WALK: SignalModel,
+    SINUSOIDAL: SinusoidalModel,
+    ORNSTEIN_UHLENBECK: OrnsteinUhlenbeckModel,
+    REPLAY: ReplayModel,
+}
+
+
+def create_model(config: dict[str, Any] | None) -> SignalModel:
+    """Create the model described by <config>, this method may do I/O.
+
+    ValueError is raised if the model or its parameters are not valid.
+    """
+    if not config:
+        return SignalModel()
+    params = dict(config)
+    model_type = params.pop(MODEL_TYPE_KEY, RANDOM_WALK)
+    if model_type not in MODELS:
+        raise ValueError(f"Unknown model <{model_type}>, expected one of {list(MODELS)}")
+    try:
+        model = MODELS[model_type](**params)
+    except (TypeError, OSError) as ex:
+        raise ValueError(f"Invalid {model_type} model: {ex}") from ex
+    return model
@@ -1,12 +1,11 @@
 """Platform for sensor integration."""
 from __future__ import annotations
 from typing import Final
-from random import randint
 import logging
 
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.const import UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.components.sensor import SCAN_INTERVAL, SensorEntity
+from homeassistant.const import CONF_SCAN_INTERVAL, UnitOfTemperature
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 from homeassistant.helpers.restore_state import (
@@ -14,12 +13,18 @@ from homeassistant.helpers.restore_state import (
 )  # To restore last stored value
 
 from . import DOMAIN
+from .engine import EmulationEngine, async_get_engine
 
 NAME_KEY = "name"
 MIN_TEMP_KEY = "min_temp"
 MAX_TEMP_KEY = "max_temp"
+COUNT_KEY = "count"
+MODEL_KEY = "model"
+SEED_KEY = "seed"
 
 DEFAULT_NAME = "Emulated Temperature Sensor"
+DEFAULT_MIN_TEMP = 18
+DEFAULT_MAX_TEMP = 25
 UNIQUE_ID_PREFIX = "PoliTo.eLite.LM."
 
 # Work but does not support scan_interval
@@ -34,19 +39,30 @@ UNIQUE_ID_PREFIX = "PoliTo.eLite.LM."
 # )
 
 """ To work properly this integration needs to have a configured "scan_interval".
-    Every x seconds the update() function is called updating the emulated temperature.
+    Every x seconds the emulated temperatures are updated all together by the engine
+    shared by the sensors with the same scan_interval. With "count" the platform
+    creates that many sensors, named "<name> 1", "<name> 2", ...
+    The temperatures are generated by a signal model (a bounded random walk by
+    default, see models.py); with a seed the sensors start from the values of
+    the model instead of the restored ones, so that two runs are identical.
 
     sensor:
     - platform: emulated_temp_sensor
       scan_interval: 300
+      count: 1000
+      seed: 42
+      model:
+        type: sinusoidal
+        period: 86400
+        clock: false    // start the cycle with the engine, not at midnight
 """
 _LOGGER = logging.getLogger(__name__)
 
 
-def setup_platform(
+async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
-    add_entities: AddEntitiesCallback,
+    async_add_entities: AddEntitiesCallback,
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up the sensor platform."""
@@ -56,25 +72,64 @@ def setup_platform(
     else:
         name = DEFAULT_NAME
 
-    if (MIN_TEMP_KEY in config) and (MAX_TEMP_KEY in config):
-        add_entities(
-            [EmulatedTempSensor(name, config[MIN_TEMP_KEY], config[MAX_TEMP_KEY])]
-        )
-    elif MIN_TEMP_KEY in config:
-        add_entities([EmulatedTempSensor(name, min_temp=config[MIN_TEMP_KEY])])
-    elif MAX_TEMP_KEY in config:
-        add_entities([EmulatedTempSensor(name, max_temp=config[MAX_TEMP_KEY])])
+    if MIN_TEMP_KEY in config:
+        min_temp = config[MIN_TEMP_KEY]
+    else:
+        min_temp = DEFAULT_MIN_TEMP
+
+    if MAX_TEMP_KEY in config:
+        max_temp = config[MAX_TEMP_KEY]
+    else:
+        max_temp = DEFAULT_MAX_TEMP
+
+    if COUNT_KEY in config:
+        count = int(config[COUNT_KEY])
+    else:
+        count = 1
+
+    if CONF_SCAN_INTERVAL in config:
+        scan_interval = config[CONF_SCAN_INTERVAL]
     else:
-        add_entities([EmulatedTempSensor(name)])
+        scan_interval = SCAN_INTERVAL
+
+    if MODEL_KEY in config:
+        model_config = config[MODEL_KEY]
+    else:
+        model_config = None
+
+    if SEED_KEY in config:
+        seed = int(config[SEED_KEY])
+    else:
+        seed = None
+
+    try:
+        engine = await async_get_engine(hass, scan_interval, model_config, seed)
+    except ValueError as ex:
+        _LOGGER.error("Invalid configuration of <%s>: %s", name, ex)
+        return
+    if count == 1:
+        names = [name]
+    else:
+        names = [f"{name} {i}" for i in range(1, count + 1)]
+    async_add_entities(
+        [EmulatedTempSensor(engine, sensor_name, min_temp, max_temp) for sensor_name in names]
+    )
 
 
 class EmulatedTempSensor(SensorEntity, RestoreEntity):
     """Representation of a Sensor. Extends Restore Entity to retrieve last temperature value."""
 
+    _attr_should_poll = False  # Updated by the engine
+
     def __init__(
-        self, name=DEFAULT_NAME, min_temp: int = 18, max_temp: int = 25
+        self,
+        engine: EmulationEngine,
+        name=DEFAULT_NAME,
+        min_temp: int = DEFAULT_MIN_TEMP,
+        max_temp: int = DEFAULT_MAX_TEMP,
     ) -> None:
         """Initialize the sensor."""
+        self._engine = engine
         self._sensor_name = name
         self._unique_id = UNIQUE_ID_PREFIX + self._sensor_name
         self._MIN_TMP: Final[int] = min_temp
@@ -84,18 +139,19 @@ class EmulatedTempSensor(SensorEntity, RestoreEntity):
     async def async_added_to_hass(self):
         """Call when entity about to be added to hass."""
 
-        # Retrieving last temperature value (if available)
+        # Retrieving last temperature value (if available and not seeded)
         last_state = await self.async_get_last_state()
-        if last_state:
+        if last_state and not self._engine.seeded:
             self._state = float(last_state.state)
-        else:  # Creating a random starting value
-            integer = randint(self._MIN_TMP, self._MAX_TMP - 1)
-            mantissa = randint(0, 9)
-            self._state = float(str(integer) + "." + str(mantissa))
+        else:  # Creating a starting value
+            self._state = self._engine.initial_value(self._MIN_TMP, self._MAX_TMP)
 
         _LOGGER.info(
             "%s - initial temperature: %s", self._sensor_name, str(self._state)
         )
+        self.async_on_remove(
+            self._engine.async_add(self, self._state, self._MIN_TMP, self._MAX_TMP)
+        )
 
     @property
     def name(self) -> str:
@@ -116,18 +172,8 @@ class EmulatedTempSensor(SensorEntity, RestoreEntity):
         """Return the unit of measurement."""
         return UnitOfTemperature.CELSIUS
 
-    def update(self) -> None:
-        """Fetch new state data for the sensor.
-
-        This is the only method that should fetch new data for Home Assistant.
-        """
-        diff = float("0." + str(randint(0, 9)))
-        case = randint(0, 2)
-        if case == 0:
-            pass
-        elif case == 1:
-            self._state = self._state - diff
-        elif case == 2:
-            self._state = self._state + diff
-
-        _LOGGER.debug("%s - updated temperature: %.2f", self._sensor_name, self._state)
+    @callback
+    def async_set_temperature(self, value: float) -> None:
+        """Set the temperature computed by the engine."""
+        self._state = value
+        self.async_write_ha_state()
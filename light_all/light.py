@@ -4,24 +4,35 @@ from typing import Any
 import logging
 
 # Import the device class from the component that you want to support
-from homeassistant.core import HomeAssistant
-from homeassistant.components.light import LightEntity
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import Context, Event, HomeAssistant, callback
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN, LightEntity
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
 from homeassistant.exceptions import ServiceNotFound
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import (
+    async_track_state_added_domain,
+    async_track_state_removed_domain,
+)
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
+from . import DOMAIN
 
 DEFAULT_NAME = "Light Turn All"
 NAME_KEY = "name"
+DEBOUNCE_KEY = "debounce"
+DEFAULT_DEBOUNCE = 0.5
 
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def setup_platform(
+async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
-    add_entities: AddEntitiesCallback,
+    async_add_entities: AddEntitiesCallback,
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Adding the LightAll to Home Assistant."""
@@ -30,25 +41,97 @@ def setup_platform(
         name = config[NAME_KEY]
     else:
         name = DEFAULT_NAME
+    if DEBOUNCE_KEY in config:
+        debounce = config[DEBOUNCE_KEY]
+    else:
+        debounce = DEFAULT_DEBOUNCE
+
+    # Ids of the contexts of the calls dispatched by any LightAll
+    hass.data.setdefault(DOMAIN, set())
 
-    add_entities([LightAll(name)])
-    return True
+    async_add_entities([LightAll(name, debounce)])
 
 
 class LightAll(LightEntity):
-    """A Light able to turn off all the lights."""
+    """A Light able to turn off all the lights.
+
+    The toggles received within <debounce> seconds are collapsed into a single
+    dispatch of the final state, and the calls generated by a dispatch of any
+    LightAll are never dispatched again.
+    """
 
-    def __init__(self, name: str = DEFAULT_NAME) -> None:
+    def __init__(self, name: str = DEFAULT_NAME, debounce: float = DEFAULT_DEBOUNCE) -> None:
         """Initialize a LightAll."""
         self._name = name
         self._brightness = None
         self._state = False
+        # Entity ids of the available lights, None when it must be rebuilt
+        self._lights: list[str] | None = None
+        self._debounce = debounce
+        self._debouncer: Debouncer | None = None
+        self._dispatch_context: Context | None = None
 
         # This object should physically communicate with the light
         self._light = LightEntity()
 
         _LOGGER.info("<%s> was created", self._name)
 
+    async def async_added_to_hass(self) -> None:
+        """Keep the list of the available lights up to date."""
+        self._debouncer = Debouncer(
+            self.hass,
+            _LOGGER,
+            cooldown=self._debounce,
+            immediate=False,
+            function=self._async_dispatch,
+        )
+        self.async_on_remove(self._debouncer.async_cancel)
+        self.async_on_remove(
+            async_track_state_added_domain(
+                self.hass, LIGHT_DOMAIN, self._async_invalidate_lights
+            )
+        )
+        self.async_on_remove(
+            async_track_state_removed_domain(
+                self.hass, LIGHT_DOMAIN, self._async_invalidate_lights
+            )
+        )
+        self.async_on_remove(
+            self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_registry_updated
+            )
+        )
+
+    @callback
+    def _async_registry_updated(self, event: Event) -> None:
+        """Rebuild the list of lights when a light is added or removed."""
+        if event.data["action"] in ("create", "remove") and event.data[
+            ATTR_ENTITY_ID
+        ].startswith(LIGHT_DOMAIN + "."):
+            self._async_invalidate_lights()
+
+    @callback
+    def _async_invalidate_lights(self, event: Event | None = None) -> None:
+        self._lights = None
+
+    @property
+    def _fan_out_contexts(self) -> set[str]:
+        return self.hass.data[DOMAIN]
+
+    def _is_fan_out(self, context: Context | None) -> bool:
+        """Return True if <context> belongs to a call dispatched by a LightAll."""
+        if context is None:
+            return False
+        contexts = self._fan_out_contexts
+        return context.id in contexts or context.parent_id in contexts
+
+    @property
+    def lights(self) -> list[str]:
+        """Return the entity ids of all the lights, this one included."""
+        if self._lights is None:
+            self._lights = self.hass.states.async_entity_ids(LIGHT_DOMAIN)
+        return self._lights
+
     @property
     def name(self) -> str:
         """Return the display name of this light."""
@@ -68,52 +151,74 @@ class LightAll(LightEntity):
         """Return true if light is on."""
         return self._state
 
-    def turn_off(self, **kwargs: Any) -> None:
+    async def async_turn_off(self, **kwargs: Any) -> None:
         """Instruct the light to turn off."""
+        if self._is_fan_out(self._context):
+            _LOGGER.debug("<%s> ignoring a call dispatched by a LightAll", self._name)
+            return
         self._brightness = 0
         self._state = False
-        self.turn(False)
-        # self.turn_recursive(False)
-        # self.turn_switches(False)
+        await self._async_schedule_dispatch()
 
-    def turn_on(self, **kwargs: Any) -> None:
+    async def async_turn_on(self, **kwargs: Any) -> None:
         """Instruct the light to turn on."""
+        if self._is_fan_out(self._context):
+            _LOGGER.debug("<%s> ignoring a call dispatched by a LightAll", self._name)
+            return
         self._brightness = 255
         self._state = True
-        self.turn(True)
-        # self.turn_recursive(True)
-        # self.turn_switches(True)
-
-    def turn(self, on: bool = True) -> None:
+        await self._async_schedule_dispatch()
+
+    async def _async_schedule_dispatch(self) -> None:
+        """Dispatch the current state once the toggles stop for <debounce> seconds."""
+        self._dispatch_context = self._context
+        await self._debouncer.async_call()
+
+    async def _async_dispatch(self) -> None:
+        await self.async_turn(self._state)
+        # await self.async_turn_recursive(self._state)
+        # await self.async_turn_switches(self._state)
+
+    async def _async_call(self, domain: str, service: str, entity_ids: list[str]) -> None:
+        """Call <service> on <entity_ids>, marking the call as a LightAll fan-out."""
+        parent = self._dispatch_context
+        context = Context(
+            user_id=parent.user_id if parent else None,
+            parent_id=parent.id if parent else None,
+        )
+        contexts = self._fan_out_contexts
+        contexts.add(context.id)
+        try:
+            await self.hass.services.async_call(
+                domain, service, {ATTR_ENTITY_ID: entity_ids}, blocking=True, context=context
+            )
+        finally:
+            contexts.discard(context.id)
+
+    async def async_turn(self, on: bool = True) -> None:
         """Turn on or off all the lights."""
         if on:
             turn = "turn_on"
         else:
             turn = "turn_off"
 
-        entities = self.hass.states.all()
-        for entity in entities:
-            if entity.entity_id.startswith("light."):
-                if self.entity_id != entity.entity_id:
-                    self.hass.services.call(
-                        "light", turn, {"entity_id": entity.entity_id}
-                    )
+        lights = [light for light in self.lights if light != self.entity_id]
+        if lights:
+            await self._async_call(LIGHT_DOMAIN, turn, lights)
 
-    # This method is recursevely called (user cannot interact properly with the lights anymore)
-    def turn_recursive(self, on: bool = True) -> None:
+    # This method would be recursevely called (user cannot interact properly with the lights anymore)
+    # if the calls dispatched by a LightAll were not ignored by the LightAll themselves
+    async def async_turn_recursive(self, on: bool = True) -> None:
         """Turn on or off all the lights (it is recursive) (T7)."""
         if on:
             turn = "turn_on"
         else:
             turn = "turn_off"
 
-        entities = self.hass.states.all()
-        for entity in entities:
-            if entity.entity_id.startswith("light."):
-                self.hass.services.call("light", turn, {"entity_id": entity.entity_id})
+        await self._async_call(LIGHT_DOMAIN, turn, self.lights)
 
     # This method interact with switches instead of lamps
-    def turn_switches(self, on: bool = True) -> None:
+    async def async_turn_switches(self, on: bool = True) -> None:
         """Turn on or off switches instead of lamps (T3)."""
         if on:
             turn = "turn_on"
@@ -121,10 +226,9 @@ class LightAll(LightEntity):
             turn = "turn_off"
 
         # x = self.hass.services._services
-        entities = self.hass.states.all()
-        for entity in entities:
-            if self.entity_id != entity.entity_id:
-                self.hass.services.call("switch", turn, {"entity_id": entity.entity_id})
+        switches = self.hass.states.async_entity_ids(SWITCH_DOMAIN)
+        if switches:
+            await self._async_call(SWITCH_DOMAIN, turn, switches)
 
     def update(self) -> None:
         """Fetch new state data for this light.
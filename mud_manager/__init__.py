@@ -0,0 +1,173 @@
+"""
+The MUD Manager component.
+It keeps an index of the integrations declaring a MUD (Manufacturer Usage Description) file.
+
+Configuration:
+To use the mud_manager component you will need to add the following line into your configuration.yaml file
+
+mud_manager:
+
+The index can be queried with the websocket command {"type": "mud_manager/index"},
+and a flow can be checked against the compiled ACLs with
+{"type": "mud_manager/check", "domain": "switch_remote", "host": "192.168.7.242"}.
+
+The other integrations do not import this component: they find its helpers in
+hass.data["mud_manager"], "is_allowed" (async_is_allowed) to check their outbound
+connections, "mud_domains" (async_mud_domains) to list the integrations with
+a MUD file and "breaker" (async_get_breaker) to get the circuit breaker of a
+host, shared by all the integrations connecting to it. The number of allowed and denied connections is returned by
+{"type": "mud_manager/metrics"}.
+
+The remote MUD files are fetched concurrently at startup, then refreshed with
+conditional GETs; the last copy is kept on disk and used while the server is
+unreachable. The refresh interval (in seconds, one day by default) can be set with
+
+mud_manager:
+  refresh_interval: 3600
+"""
+from __future__ import annotations
+from datetime import timedelta
+from typing import Any
+import logging
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.const import EVENT_COMPONENT_LOADED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
+
+from .acl import FROM_DEVICE, TO_DEVICE
+from .breaker import CircuitBreaker
+from .enforcer import MudEnforcer, get_host
+from .fetcher import DEFAULT_REFRESH_INTERVAL, MudFetcher
+from .index import MudIndex
+
+# The domain of your component. Should be equal to the name of your component.
+DOMAIN = "mud_manager"
+INDEX_KEY = "index"
+ENFORCER_KEY = "enforcer"
+FETCHER_KEY = "fetcher"
+IS_ALLOWED_KEY = "is_allowed"
+MUD_DOMAINS_KEY = "mud_domains"
+BREAKER_KEY = "breaker"
+BREAKERS_KEY = "breakers"
+REFRESH_INTERVAL_KEY = "refresh_interval"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the MUD index."""
+    conf = config.get(DOMAIN) or {}
+    if REFRESH_INTERVAL_KEY in conf:
+        refresh_interval = int(conf[REFRESH_INTERVAL_KEY])
+    else:
+        refresh_interval = DEFAULT_REFRESH_INTERVAL
+
+    index = MudIndex(hass)
+    fetcher = MudFetcher(hass, index)
+    hass.data[DOMAIN] = {
+        INDEX_KEY: index,
+        ENFORCER_KEY: MudEnforcer(index),
+        FETCHER_KEY: fetcher,
+        IS_ALLOWED_KEY: async_is_allowed,
+        MUD_DOMAINS_KEY: async_mud_domains,
+        BREAKER_KEY: async_get_breaker,
+        BREAKERS_KEY: {},
+    }
+
+    async def _async_update_domain(domain: str) -> None:
+        await index.async_update_domain(domain)
+        await fetcher.async_fetch_domain(domain)
+
+    @callback
+    def _async_component_loaded(event: Event) -> None:
+        # Platforms are notified as <platform>.<integration>
+        domain = event.data["component"].split(".")[-1]
+        hass.async_create_task(_async_update_domain(domain))
+
+    async def _async_start() -> None:
+        await index.async_build()
+        # The copies on disk are enforced until the servers answer
+        await fetcher.async_load()
+        await fetcher.async_refresh()
+        async_track_time_interval(
+            hass, fetcher.async_refresh, timedelta(seconds=refresh_interval)
+        )
+
+    hass.bus.async_listen(EVENT_COMPONENT_LOADED, _async_component_loaded)
+    hass.async_create_task(_async_start())
+
+    websocket_api.async_register_command(hass, websocket_mud_index)
+    websocket_api.async_register_command(hass, websocket_mud_check)
+    websocket_api.async_register_command(hass, websocket_mud_metrics)
+    return True
+
+
+@callback
+def async_is_allowed(hass: HomeAssistant, domain: str, target: str) -> bool:
+    """Return True if <domain> may connect to <target>, an url or a host name.
+
+    The integrations without a MUD file are not restricted.
+    """
+    return hass.data[DOMAIN][ENFORCER_KEY].is_allowed(domain, target)
+
+
+@callback
+def async_mud_domains(hass: HomeAssistant) -> list[str]:
+    """Return the domains of the integrations with a MUD file."""
+    return list(hass.data[DOMAIN][INDEX_KEY].entries)
+
+
+@callback
+def async_get_breaker(hass: HomeAssistant, target: str) -> CircuitBreaker:
+    """Return the circuit breaker of the host of <target>, an url or a host name."""
+    host = get_host(target)
+    breakers = hass.data[DOMAIN][BREAKERS_KEY]
+    if host not in breakers:
+        breakers[host] = CircuitBreaker(host)
+    return breakers[host]
+
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/index"})
+@websocket_api.async_response
+async def websocket_mud_index(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Return the integrations with a MUD file, their path and ACL summary."""
+    entries = await hass.data[DOMAIN][INDEX_KEY].async_get_entries()
+    connection.send_result(
+        msg["id"], {domain: entry.as_dict() for domain, entry in entries.items()}
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/check",
+        vol.Required("domain"): str,
+        vol.Required("host"): str,
+        vol.Optional("direction", default=FROM_DEVICE): vol.In([FROM_DEVICE, TO_DEVICE]),
+    }
+)
+@websocket_api.async_response
+async def websocket_mud_check(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Return whether the MUD file of an integration allows a flow (None without MUD)."""
+    index = hass.data[DOMAIN][INDEX_KEY]
+    await index.async_get_entries()
+    connection.send_result(
+        msg["id"],
+        {"allowed": index.is_allowed(msg["domain"], msg["host"], msg["direction"])},
+    )
+
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/metrics"})
+@callback
+def websocket_mud_metrics(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Return the number of outbound connections allowed and denied per integration."""
+    connection.send_result(msg["id"], hass.data[DOMAIN][ENFORCER_KEY].metrics())
@@ -0,0 +1,97 @@
+"""Circuit breaker protecting the remote hosts from requests bound to fail."""
+from __future__ import annotations
+import logging
+import random
+import time
+
+FAILURE_THRESHOLD = 3  # Consecutive failures opening the circuit
+MIN_BACKOFF = 5
+MAX_BACKOFF = 300
+PROBE_TIMEOUT = 60  # Seconds after which a probe without outcome is abandoned
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Fail fast while a host is down.
+
+    After FAILURE_THRESHOLD consecutive failures the circuit opens: the
+    requests are refused without contacting the server. When the backoff
+    expires a single probe is let through (half open): if it succeeds the
+    circuit closes, otherwise it opens again for twice the time. The backoff
+    is randomized so that the clients of a host do not retry together.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        min_backoff: float = MIN_BACKOFF,
+        max_backoff: float = MAX_BACKOFF,
+    ) -> None:
+        self._name = name
+        self._failure_threshold = failure_threshold
+        self._min_backoff = min_backoff
+        self._max_backoff = max_backoff
+        self._backoff = min_backoff
+        self._failures = 0
+        self._retry_at = 0.0
+        self._probe_started = 0.0
+        self.state = CLOSED
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while the requests are refused (a probe may be running)."""
+        return self.state != CLOSED
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent to the server."""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN and now >= self._retry_at:
+            self.state = HALF_OPEN
+        elif self.state == HALF_OPEN and now - self._probe_started > PROBE_TIMEOUT:
+            _LOGGER.debug("Probe of <%s> without outcome, sending another one", self._name)
+        else:
+            return False
+        self._probe_started = now
+        return True
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        if self.state != CLOSED:
+            _LOGGER.info("<%s> is reachable again", self._name)
+        self.state = CLOSED
+        self._failures = 0
+        self._backoff = self._min_backoff
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit if needed."""
+        self._failures += 1
+        if self.state == OPEN:  # Late outcome of a request sent before opening
+            return
+        if self.state == CLOSED and self._failures < self._failure_threshold:
+            return
+        delay = self._backoff * random.uniform(0.5, 1.5)
+        if self.state == CLOSED:
+            _LOGGER.warning(
+                "<%s> failed %d times in a row, retrying in %.0f seconds",
+                self._name, self._failures, delay,
+            )
+        else:
+            _LOGGER.debug("<%s> is still unreachable, retrying in %.0f seconds", self._name, delay)
+        self.state = OPEN
+        self._retry_at = time.monotonic() + delay
+        self._backoff = min(2 * self._backoff, self._max_backoff)
+
+    def record_status(self, status: int) -> None:
+        """Record the outcome of a request from its HTTP status: 5xx are failures."""
+        if status >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
@@ -0,0 +1,96 @@
+"""Check the outbound connections of the integrations against their MUD file."""
+from __future__ import annotations
+from collections import Counter, OrderedDict
+from typing import Any
+from urllib.parse import urlsplit
+import logging
+import time
+
+from .acl import FROM_DEVICE
+from .index import MudIndex
+
+DEFAULT_CACHE_TTL = 300
+DEFAULT_CACHE_SIZE = 1024
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_host(target: str) -> str:
+    """Return the host of an url, or <target> itself if it is already a host."""
+    if "://" in target:
+        return urlsplit(target).hostname or ""
+    return target.split("/", 1)[0].rsplit(":", 1)[0]
+
+
+class MudEnforcer:
+    """Decide whether an integration may connect to an url.
+
+    The decisions are memoized in a LRU cache whose entries expire after
+    <ttl> seconds, and which is cleared every time the MUD index changes:
+    on the hot path a check costs a dictionary lookup. The integrations
+    without a MUD file are not restricted.
+    """
+
+    def __init__(
+        self,
+        index: MudIndex,
+        ttl: float = DEFAULT_CACHE_TTL,
+        max_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        self._index = index
+        self._ttl = ttl
+        self._max_size = max_size
+        self._cache: OrderedDict[tuple[str, str], tuple[bool, float]] = OrderedDict()
+        self._index_version = index.version
+        self.allowed: Counter[str] = Counter()
+        self.denied: Counter[str] = Counter()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def is_allowed(self, domain: str, target: str) -> bool:
+        """Return True if <domain> may open a connection towards <target>.
+
+        <target> can be an url or a host name.
+        """
+        if self._index_version != self._index.version:
+            self._cache.clear()
+            self._index_version = self._index.version
+
+        key = (domain, target)
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None and cached[1] > now:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            allowed = cached[0]
+        else:
+            self.cache_misses += 1
+            allowed = self._index.is_allowed(domain, get_host(target), FROM_DEVICE)
+            if allowed is None:  # No MUD file to enforce
+                allowed = True
+            elif not allowed:
+                _LOGGER.warning(
+                    "Connection of <%s> towards <%s> denied by its MUD file", domain, target
+                )
+            self._cache[key] = (allowed, now + self._ttl)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._max_size:
+                self._cache.popitem(last=False)
+
+        if allowed:
+            self.allowed[domain] += 1
+        else:
+            self.denied[domain] += 1
+        return allowed
+
+    def metrics(self) -> dict[str, Any]:
+        """Return the number of decisions per domain and the cache statistics."""
+        return {
+            "allowed": dict(self.allowed),
+            "denied": dict(self.denied),
+            "cache": {
+                "size": len(self._cache),
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+            },
+        }
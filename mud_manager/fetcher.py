@@ -0,0 +1,124 @@
+"""Download the remote MUD files and keep a copy of them on disk."""
+from __future__ import annotations
+from datetime import datetime
+from typing import Any
+import asyncio
+import logging
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+
+from .acl import compile_mud
+from .index import MudEntry, MudIndex
+
+STORAGE_KEY = "mud_manager.remote_mud"
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+REQUEST_TIMEOUT = 30
+DEFAULT_REFRESH_INTERVAL = 24 * 60 * 60
+
+ETAG_KEY = "etag"
+LAST_MODIFIED_KEY = "last_modified"
+DOCUMENT_KEY = "document"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class MudFetcher:
+    """Fetch the remote MUD files of the index concurrently.
+
+    Every downloaded file is stored with its ETag and Last-Modified headers,
+    so that the following refreshes are conditional GETs and the last copy
+    can be used at startup, or when the server is unreachable.
+    """
+
+    def __init__(self, hass: HomeAssistant, index: MudIndex) -> None:
+        self._hass = hass
+        self._index = index
+        self._session = async_get_clientsession(hass)
+        self._timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # Url of the MUD file -> ETag, Last-Modified and content
+        self._cache: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Apply the copies stored on disk to the remote entries of the index."""
+        self._cache = await self._store.async_load() or {}
+        for entry in self._remote_entries():
+            if entry.path in self._cache:
+                self._async_apply(entry, self._cache[entry.path][DOCUMENT_KEY])
+
+    async def async_refresh(self, now: datetime | None = None) -> None:
+        """Fetch all the remote MUD files concurrently."""
+        entries = list(self._remote_entries())
+        if not entries:
+            return
+        results = await asyncio.gather(*(self._async_fetch(entry) for entry in entries))
+        if any(results):
+            self._store.async_delay_save(lambda: self._cache, SAVE_DELAY)
+        _LOGGER.debug("%d remote MUD files refreshed, %d changed", len(entries), sum(results))
+
+    async def async_fetch_domain(self, domain: str) -> None:
+        """Fetch the MUD file of <domain>, if it is remote and was never fetched."""
+        entry = self._index.entries.get(domain)
+        if entry is None or not entry.remote or entry.policy is not None:
+            return
+        if entry.path in self._cache:
+            self._async_apply(entry, self._cache[entry.path][DOCUMENT_KEY])
+        if await self._async_fetch(entry):
+            self._store.async_delay_save(lambda: self._cache, SAVE_DELAY)
+
+    def _remote_entries(self):
+        return (entry for entry in self._index.entries.values() if entry.remote)
+
+    async def _async_fetch(self, entry: MudEntry) -> bool:
+        """Fetch a remote MUD file, return True if a new version was downloaded."""
+        cached = self._cache.get(entry.path)
+        headers = {}
+        if cached is not None:
+            if cached.get(ETAG_KEY):
+                headers["If-None-Match"] = cached[ETAG_KEY]
+            if cached.get(LAST_MODIFIED_KEY):
+                headers["If-Modified-Since"] = cached[LAST_MODIFIED_KEY]
+
+        try:
+            async with self._session.get(
+                entry.path, headers=headers, timeout=self._timeout
+            ) as response:
+                if response.status == 304:
+                    _LOGGER.debug("The MUD file <%s> did not change", entry.path)
+                    return False
+                response.raise_for_status()
+                document = await response.json(content_type=None)
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as ex:
+            if cached is None:
+                _LOGGER.error("Impossible to fetch the MUD file <%s>: %s", entry.path, ex)
+            else:
+                _LOGGER.warning(
+                    "Impossible to fetch the MUD file <%s>, using the cached copy: %s",
+                    entry.path, ex,
+                )
+            return False
+
+        if not self._async_apply(entry, document):
+            return False
+        self._cache[entry.path] = {
+            ETAG_KEY: etag,
+            LAST_MODIFIED_KEY: last_modified,
+            DOCUMENT_KEY: document,
+        }
+        return True
+
+    def _async_apply(self, entry: MudEntry, document: dict[str, Any]) -> bool:
+        try:
+            policy = compile_mud(document)
+        except ValueError as ex:
+            _LOGGER.error("Invalid MUD file <%s>: %s", entry.path, ex)
+            return False
+        self._index.async_set_policy(entry.domain, policy)
+        return True
@@ -0,0 +1,133 @@
+"""Index of the integrations declaring a MUD file in their manifest."""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any
+import asyncio
+import logging
+import os
+
+from homeassistant.core import HomeAssistant
+from homeassistant.loader import Integration
+
+from .acl import FROM_DEVICE, MudPolicy, load_mud_file
+
+MUD_FILE_KEY = "mud_file"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class MudEntry:
+    """The MUD file of an integration."""
+
+    domain: str
+    path: str  # Absolute path of a local file, url of a remote one
+    remote: bool
+    policy: MudPolicy | None = None  # None if the file was not parsed
+
+    @property
+    def acl(self) -> dict[str, Any] | None:
+        """Return the summary of the ACLs."""
+        if self.policy is None:
+            return None
+        return self.policy.summary()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"path": self.path, "remote": self.remote, "acl": self.acl}
+
+
+def load_mud_policy(path: str) -> MudPolicy | None:
+    """Parse and compile a local MUD file, this method does I/O."""
+    try:
+        return load_mud_file(path)
+    except (OSError, ValueError) as ex:
+        _LOGGER.error("Impossible to parse the MUD file <%s>: %s", path, ex)
+        return None
+
+
+class MudIndex:
+    """Map each integration declaring a MUD file to its path and compiled ACLs.
+
+    The index is built once, then it is updated only for the integrations that
+    are loaded afterwards, so the queries do not walk all the manifests.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._entries: dict[str, MudEntry] = {}
+        self._built = asyncio.Event()
+        # Incremented at every change, to invalidate what is derived from the index
+        self.version = 0
+
+    @property
+    def entries(self) -> dict[str, MudEntry]:
+        """Return the entries of the index, keyed by domain."""
+        return self._entries
+
+    async def async_get_entries(self) -> dict[str, MudEntry]:
+        """Return the entries of the index, waiting for it to be built."""
+        await self._built.wait()
+        return self._entries
+
+    def is_allowed(self, domain: str, host: str, direction: str = FROM_DEVICE) -> bool | None:
+        """Return True if <domain> may exchange traffic with <host>.
+
+        None is returned if the integration has no compiled MUD policy.
+        """
+        entry = self._entries.get(domain)
+        if entry is None or entry.policy is None:
+            return None
+        return entry.policy.is_allowed(host, direction)
+
+    def _get_entry(self, domain: str, integration: Any) -> MudEntry | None:
+        if not isinstance(integration, Integration):  # Still resolving
+            return None
+        mud_file = integration.manifest.get(MUD_FILE_KEY)
+        if not mud_file:
+            return None
+        if mud_file.lower().startswith("http"):
+            return MudEntry(domain, mud_file, True)
+        return MudEntry(domain, os.path.join(integration.file_path, mud_file), False)
+
+    async def async_build(self) -> None:
+        """Index all the integrations known by Home Assistant."""
+        integrations = self._hass.data["integrations"]
+        entries = {}
+        for domain, integration in list(integrations.items()):
+            if entry := self._get_entry(domain, integration):
+                entries[domain] = entry
+
+        await self._hass.async_add_executor_job(self._parse_local_files, entries.values())
+        self._entries.update(entries)
+        self.version += 1
+        self._built.set()
+        _LOGGER.info("%d integrations with a MUD file indexed", len(self._entries))
+
+    async def async_update_domain(self, domain: str) -> None:
+        """Index again a single integration, e.g. because it was just loaded."""
+        integration = self._hass.data["integrations"].get(domain)
+        entry = self._get_entry(domain, integration)
+        if entry is None:
+            if self._entries.pop(domain, None) is not None:
+                self.version += 1
+            return
+        old_entry = self._entries.get(domain)
+        if old_entry is not None and old_entry.path == entry.path:
+            return
+        await self._hass.async_add_executor_job(self._parse_local_files, [entry])
+        self._entries[domain] = entry
+        self.version += 1
+
+    def async_set_policy(self, domain: str, policy: MudPolicy) -> None:
+        """Set the compiled policy of a remote MUD file, once it was fetched."""
+        entry = self._entries.get(domain)
+        if entry is None or entry.policy == policy:
+            return
+        entry.policy = policy
+        self.version += 1
+
+    @staticmethod
+    def _parse_local_files(entries) -> None:
+        for entry in entries:
+            if not entry.remote:
+                entry.policy = load_mud_policy(entry.path)
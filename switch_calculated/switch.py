@@ -1,6 +1,18 @@
-"""An example of switch configured as calculated."""
+"""An example of switch configured as calculated.
+
+Configuration:
+
+switch:
+  - platform: switch_calculated
+    delay: 2
+
+The switch is actuated <delay> seconds after a command; meanwhile it reports
+the requested state and the attribute transitioning. A newer command cancels
+the transition in progress.
+"""
 from __future__ import annotations
-import time
+from typing import Any
+import asyncio
 import logging
 
 # from voluptuous.validators import PathExists
@@ -10,27 +22,36 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
+DELAY_KEY = "delay"
+DEFAULT_DELAY = 2
+ATTR_TRANSITIONING = "transitioning"
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def setup_platform(
+async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
-    add_entities: AddEntitiesCallback,
+    async_add_entities: AddEntitiesCallback,
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up the sensor platform."""
 
-    add_entities([SwitchCalculated()])
-    return True
+    if DELAY_KEY in config:
+        delay = float(config[DELAY_KEY])
+    else:
+        delay = DEFAULT_DELAY
+
+    async_add_entities([SwitchCalculated(delay)])
 
 
 class SwitchCalculated(SwitchEntity):
     """This Switch uses almost all the method of its superclasses."""
 
-    def __init__(self):
+    def __init__(self, delay=DEFAULT_DELAY):
         self._attr_is_on = False
+        self._delay = delay
+        self._transition: asyncio.Task | None = None
         _LOGGER.debug("I'm the Switch: <%s>", self.name)
 
     @property
@@ -38,14 +59,38 @@ class SwitchCalculated(SwitchEntity):
         """Name of the entity."""
         return "Switch Calculated"
 
-    def turn_on(self, **kwargs):
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return whether the switch is waiting to be actuated."""
+        return {ATTR_TRANSITIONING: self._transition is not None}
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the transition in progress."""
+        self._cancel_transition()
+
+    async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
-        time.sleep(2)
-        self._attr_is_on = True
-        _LOGGER.debug("I am on!")
+        self._start_transition(True)
 
-    def turn_off(self, **kwargs):
+    async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
-        time.sleep(2)
-        self._attr_is_on = False
-        _LOGGER.debug("I am off!")
+        self._start_transition(False)
+
+    def _cancel_transition(self) -> None:
+        if self._transition is not None:
+            self._transition.cancel()
+            self._transition = None
+
+    def _start_transition(self, is_on: bool) -> None:
+        """Report the requested state optimistically, then actuate it after the delay."""
+        self._cancel_transition()
+        self._attr_is_on = is_on
+        self._transition = self.hass.async_create_task(self._async_actuate(is_on))
+        self.async_write_ha_state()
+
+    async def _async_actuate(self, is_on: bool) -> None:
+        await asyncio.sleep(self._delay)
+        self._transition = None
+        self._attr_is_on = is_on
+        self.async_write_ha_state()
+        _LOGGER.debug("I am %s!", "on" if is_on else "off")
@@ -1 +1,4 @@
 """An example of a switch integration based on a file."""
+
+# The domain of your component. Should be equal to the name of your component.
+DOMAIN = "switch_file"
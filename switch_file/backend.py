@@ -0,0 +1,135 @@
+"""Read and write the files of all the SwitchFile entities in batches."""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import tempfile
+
+from homeassistant.core import HomeAssistant, callback
+
+from . import DOMAIN
+
+BACKEND_KEY = "backend"
+# Mode of the files created by open(), mkstemp would create them with 0600
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_backend(hass: HomeAssistant) -> SwitchFileBackend:
+    """Return the backend shared by all the file switches."""
+    data = hass.data.setdefault(DOMAIN, {})
+    if BACKEND_KEY not in data:
+        data[BACKEND_KEY] = SwitchFileBackend(hass)
+    return data[BACKEND_KEY]
+
+
+def write_switch_file(path: str, on: bool) -> None:
+    """Create or remove a switch file, this method does I/O.
+
+    The file is created atomically: a temporary file is written in the same
+    directory, then renamed. An existing file is left untouched.
+    """
+    if not on:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            _LOGGER.debug("The switch <%s> was already off.", path)
+        return
+    if os.path.exists(path):
+        return
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=os.path.dirname(path) or None)
+    try:
+        os.close(fd)
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+
+
+def scan_switch_files(paths) -> dict[str, bool]:
+    """Return whether each path is an existing file, this method does I/O.
+
+    Every directory is listed once, instead of doing one stat per path.
+    """
+    directories: dict[str, dict[str, str]] = {}
+    for path in paths:
+        directory, name = os.path.split(path)
+        directories.setdefault(directory, {})[name] = path
+
+    states = dict.fromkeys(paths, False)
+    for directory, names in directories.items():
+        try:
+            with os.scandir(directory or ".") as entries:
+                for entry in entries:
+                    if entry.name in names and entry.is_file():
+                        states[names[entry.name]] = True
+        except OSError as ex:
+            _LOGGER.debug("Impossible to list <%s>: %s", directory, ex)
+    return states
+
+
+class SwitchFileBackend:
+    """Group the operations of all the file switches into one executor job per tick.
+
+    The writes and reads requested during the same iteration of the event
+    loop are done together: the writes first, then a single scan of each
+    directory refreshes the state of every requested switch.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._writes: dict[str, bool] = {}
+        self._reads: set[str] = set()
+        self._waiters: list[tuple[str, asyncio.Future[bool]]] = []
+        self._scheduled = False
+
+    async def async_exists(self, path: str) -> bool:
+        """Return True if the switch file exists."""
+        self._reads.add(path)
+        return await self._async_wait(path)
+
+    async def async_write(self, path: str, on: bool) -> bool:
+        """Create (on) or remove the switch file, then return whether it exists."""
+        self._writes[path] = on
+        self._reads.add(path)
+        return await self._async_wait(path)
+
+    async def _async_wait(self, path: str) -> bool:
+        future: asyncio.Future[bool] = self._hass.loop.create_future()
+        self._waiters.append((path, future))
+        if not self._scheduled:
+            self._scheduled = True
+            self._hass.loop.call_soon(self._async_flush)
+        return await future
+
+    @callback
+    def _async_flush(self) -> None:
+        self._scheduled = False
+        writes, reads, waiters = self._writes, self._reads, self._waiters
+        self._writes, self._reads, self._waiters = {}, set(), []
+        self._hass.async_create_task(self._async_run(writes, reads, waiters))
+
+    async def _async_run(self, writes, reads, waiters) -> None:
+        try:
+            states = await self._hass.async_add_executor_job(self._run, writes, reads)
+        except Exception as ex:  # pylint: disable=broad-except
+            for _, future in waiters:
+                if not future.done():
+                    future.set_exception(ex)
+            return
+        for path, future in waiters:
+            if not future.done():
+                future.set_result(states[path])
+
+    @staticmethod
+    def _run(writes: dict[str, bool], reads: set[str]) -> dict[str, bool]:
+        for path, on in writes.items():
+            try:
+                write_switch_file(path, on)
+            except OSError as ex:
+                _LOGGER.error("Impossible to turn %s <%s>: %s", "on" if on else "off", path, ex)
+        return scan_switch_files(reads)
@@ -1,4 +1,16 @@
-"""An example of switch shown at PyCon 2016"""
+"""An example of switch shown at PyCon 2016
+
+Configuration:
+
+switch:
+  - platform: switch_file
+    file_path: /tmp/switch
+    watch: true
+
+With watch enabled the file is watched (inotify) instead of being polled,
+so the state changes as soon as the file is created or removed.
+The file operations of all the switches are done in batches, in the executor.
+"""
 from __future__ import annotations
 import os
 import logging
@@ -6,30 +18,44 @@ import logging
 # from voluptuous.validators import PathExists
 from homeassistant.components.switch import SwitchEntity
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
+from .backend import get_backend
+from .watcher import get_watcher
+
+FILE_PATH_KEY = "file_path"
+WATCH_KEY = "watch"
+
 _LOGGER = logging.getLogger(__name__)
 
 
-def setup_platform(
+async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
-    add_entities: AddEntitiesCallback,
+    async_add_entities: AddEntitiesCallback,
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up the sensor platform."""
 
-    add_entities([SwitchFile(config["file_path"])])
+    if WATCH_KEY in config:
+        watch = bool(config[WATCH_KEY])
+    else:
+        watch = False
+
+    # The state is read before adding the entity
+    async_add_entities([SwitchFile(config[FILE_PATH_KEY], watch)], True)
 
 
 class SwitchFile(SwitchEntity):
     """This Switch base its state on a file."""
 
-    def __init__(self, path):
+    def __init__(self, path, watch=False):
         self._path = path
-        self.update()
+        self._state = None
+        self._watch = watch
+        self._attr_should_poll = not watch
         _LOGGER.info("I'm the SwitchFile: %s", self.name)
 
     @property
@@ -42,17 +68,37 @@ class SwitchFile(SwitchEntity):
         """If the switch is currently on or off."""
         return self._state
 
-    def turn_on(self, **kwargs):
+    async def async_added_to_hass(self) -> None:
+        """Watch the file, if the watch mode is enabled."""
+        if not self._watch:
+            return
+        try:
+            self.async_on_remove(
+                await get_watcher(self.hass).async_watch(self._path, self._async_file_changed)
+            )
+        except OSError as ex:
+            _LOGGER.error("Impossible to watch <%s>, polling it: %s", self._path, ex)
+            self._attr_should_poll = True
+            return
+        # The file may have changed while the watch was being set up
+        self.async_schedule_update_ha_state(True)
+
+    @callback
+    def _async_file_changed(self, exists: bool) -> None:
+        if exists != self._state:
+            self._state = exists
+            self.async_write_ha_state()
+
+    async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
-        open(self._path, "ab").close()
+        self._state = await get_backend(self.hass).async_write(self._path, True)
+        self.async_write_ha_state()
 
-    def turn_off(self, **kwargs):
+    async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
-        if os.path.isfile(self._path):
-            os.remove(self._path)
-        else:
-            _LOGGER.debug("The switch was already off.")
+        self._state = await get_backend(self.hass).async_write(self._path, False)
+        self.async_write_ha_state()
 
-    def update(self):
+    async def async_update(self):
         """Update the status of the switch."""
-        self._state = os.path.isfile(self._path)
+        self._state = await get_backend(self.hass).async_exists(self._path)
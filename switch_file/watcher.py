@@ -0,0 +1,115 @@
+"""Watch the files of all the SwitchFile entities with a single observer."""
+from __future__ import annotations
+from collections.abc import Callable
+import asyncio
+import logging
+import os
+
+from watchdog.events import (
+    EVENT_TYPE_CREATED,
+    EVENT_TYPE_DELETED,
+    EVENT_TYPE_MOVED,
+    FileSystemEvent,
+    FileSystemEventHandler,
+)
+from watchdog.observers import Observer
+from watchdog.observers.api import ObservedWatch
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+from . import DOMAIN
+
+WATCHER_KEY = "watcher"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_watcher(hass: HomeAssistant) -> SwitchFileWatcher:
+    """Return the watcher shared by all the file switches."""
+    data = hass.data.setdefault(DOMAIN, {})
+    if WATCHER_KEY not in data:
+        data[WATCHER_KEY] = SwitchFileWatcher(hass)
+    return data[WATCHER_KEY]
+
+
+class SwitchFileWatcher(FileSystemEventHandler):
+    """Notify the file switches when their file is created or removed.
+
+    A single observer thread watches the directories of all the files (one
+    inotify watch per directory), so no I/O is done while nothing changes.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._observer: Observer | None = None
+        self._lock = asyncio.Lock()
+        # Absolute path of a file -> callbacks receiving whether the file exists
+        self._callbacks: dict[str, list[Callable[[bool], None]]] = {}
+        # Directory -> (watch, number of watched files in it)
+        self._watches: dict[str, tuple[ObservedWatch, int]] = {}
+
+    async def async_watch(
+        self, path: str, on_change: Callable[[bool], None]
+    ) -> CALLBACK_TYPE:
+        """Call <on_change> every time <path> is created or removed.
+
+        OSError is raised if the directory of <path> cannot be watched.
+        """
+        path = os.path.abspath(path)
+        directory = os.path.dirname(path)
+        async with self._lock:
+            if self._observer is None:
+                self._observer = Observer()
+                await self._hass.async_add_executor_job(self._observer.start)
+                self._hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_stop)
+            if directory in self._watches:
+                watch, count = self._watches[directory]
+            else:
+                watch = await self._hass.async_add_executor_job(
+                    self._observer.schedule, self, directory, False
+                )
+                count = 0
+            self._watches[directory] = (watch, count + 1)
+            self._callbacks.setdefault(path, []).append(on_change)
+
+        @callback
+        def _async_unwatch() -> None:
+            self._callbacks[path].remove(on_change)
+            if not self._callbacks[path]:
+                del self._callbacks[path]
+            watch, count = self._watches.pop(directory)
+            if count > 1:
+                self._watches[directory] = (watch, count - 1)
+            elif self._observer is not None:
+                self._hass.async_add_executor_job(self._observer.unschedule, watch)
+
+        return _async_unwatch
+
+    async def _async_stop(self, event: Event) -> None:
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.stop()
+            await self._hass.async_add_executor_job(observer.join)
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        """Forward the event to the event loop, this runs in the observer thread."""
+        if event.is_directory:
+            return
+        if event.event_type == EVENT_TYPE_CREATED:
+            changes = [(event.src_path, True)]
+        elif event.event_type == EVENT_TYPE_DELETED:
+            changes = [(event.src_path, False)]
+        elif event.event_type == EVENT_TYPE_MOVED:
+            changes = [(event.src_path, False), (event.dest_path, True)]
+        else:
+            return
+        for path, exists in changes:
+            self._hass.loop.call_soon_threadsafe(
+                self._async_notify, os.path.abspath(os.fsdecode(path)), exists
+            )
+
+    @callback
+    def _async_notify(self, path: str, exists: bool) -> None:
+        for on_change in self._callbacks.get(path, ()):
+            on_change(exists)
@@ -0,0 +1,221 @@
+"""Async client used by the remote switches to talk with their server."""
+from __future__ import annotations
+from collections.abc import Callable
+import asyncio
+import json
+import logging
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+
+from . import DOMAIN
+
+SWITCH_PATH = "/api/switches/{}"
+SWITCHES_PATH = "/api/switches"
+EVENTS_PATH = "/api/switches/events"
+REQUEST_TIMEOUT = 10
+# The server is expected to send at least a keep-alive comment in this time
+EVENTS_READ_TIMEOUT = 90
+MUD_MANAGER_DOMAIN = "mud_manager"
+MUD_IS_ALLOWED_KEY = "is_allowed"
+MUD_BREAKER_KEY = "breaker"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BulkNotSupported(Exception):
+    """The remote server does not expose the bulk endpoint."""
+
+
+class PushNotSupported(Exception):
+    """The remote server does not expose the stream of the switch changes."""
+
+
+class SwitchRemoteApi:
+    """Client of the REST server storing the status of the remote switches."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: aiohttp.ClientSession,
+        url: str,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> None:
+        self._hass = hass
+        self._session = session
+        self._url = url
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        # Shared by all the entities connecting to the host, see mud_manager
+        self.breaker = hass.data[MUD_MANAGER_DOMAIN][MUD_BREAKER_KEY](hass, url)
+        self._mud_is_allowed = hass.data[MUD_MANAGER_DOMAIN][MUD_IS_ALLOWED_KEY]
+
+    @property
+    def url(self) -> str:
+        """Base url of the remote server."""
+        return self._url
+
+    def _get_timeout(self, timeout: float | None) -> aiohttp.ClientTimeout:
+        if timeout is None:
+            return self._timeout
+        return aiohttp.ClientTimeout(total=timeout)
+
+    def _allow_request(self) -> bool:
+        """Check the MUD file and the circuit breaker before contacting the server."""
+        if not self._mud_is_allowed(self._hass, DOMAIN, self._url):
+            return False
+        if not self.breaker.allow_request():
+            _LOGGER.debug("<%s> is unreachable, request skipped", self._url)
+            return False
+        return True
+
+    def _log_connection_error(self, ex: Exception) -> None:
+        self.breaker.record_failure()
+        if self.breaker.is_open:  # Already reported by the breaker
+            _LOGGER.debug("Error contacting <%s>: %s", self._url, ex)
+        else:
+            _LOGGER.error("Error contacting <%s>: %s", self._url, ex)
+
+    async def async_get_value(
+        self, switch_id: int, timeout: float | None = None
+    ) -> bool | None:
+        """Retrieve the status of a switch, None if it is not available."""
+        if not self._allow_request():
+            return None
+        try:
+            async with self._session.get(
+                self._url + SWITCH_PATH.format(switch_id),
+                timeout=self._get_timeout(timeout),
+            ) as response:
+                self.breaker.record_status(response.status)
+                if response.status != 200:
+                    _LOGGER.error("Impossible to retrieve switch status!")
+                    return None
+                value = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            self._log_connection_error(ex)
+            return None
+        except ValueError as ex:
+            _LOGGER.error("Error parsing json object: %s", ex)
+            return None
+
+        if value and "value" in value:
+            return bool(value["value"])
+        return None
+
+    async def async_get_values(
+        self, switch_ids: list[int], timeout: float | None = None
+    ) -> dict[int, bool] | None:
+        """Retrieve the status of many switches with a single request.
+
+        The server is expected to answer with a list of {"id": x, "value": y}
+        objects. BulkNotSupported is raised if the endpoint does not exist.
+        """
+        if not self._allow_request():
+            return None
+        params = {"ids": ",".join(str(switch_id) for switch_id in switch_ids)}
+        try:
+            async with self._session.get(
+                self._url + SWITCHES_PATH,
+                params=params,
+                timeout=self._get_timeout(timeout),
+            ) as response:
+                self.breaker.record_status(response.status)
+                if response.status in (404, 405, 501):
+                    raise BulkNotSupported(self._url)
+                if response.status != 200:
+                    _LOGGER.error("Impossible to retrieve switches status!")
+                    return None
+                values = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            self._log_connection_error(ex)
+            return None
+        except ValueError as ex:
+            _LOGGER.error("Error parsing json object: %s", ex)
+            return None
+
+        try:
+            return {
+                int(value["id"]): bool(value["value"])
+                for value in values
+                if "value" in value
+            }
+        except (KeyError, TypeError, ValueError) as ex:
+            _LOGGER.error("Unexpected bulk answer from <%s>: %s", self._url, ex)
+            return None
+
+    async def async_put_value(self, switch_id: int, value: bool) -> bool:
+        """Store the new status of a switch on the remote server."""
+        if not self._allow_request():
+            return False
+        try:
+            async with self._session.put(
+                self._url + SWITCH_PATH.format(switch_id),
+                json={"value": value, "id": switch_id, "user": 1},
+                timeout=self._timeout,
+            ) as response:
+                self.breaker.record_status(response.status)
+                if response.status == 200:
+                    return True
+                error = await response.json(content_type=None)
+                _LOGGER.error("Error storing new status: %s", error["error"])
+                return False
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            self._log_connection_error(ex)
+            return False
+        except (ValueError, KeyError, TypeError) as ex:
+            _LOGGER.error("Error parsing json object: %s", ex)
+            return False
+
+    async def async_listen_events(
+        self,
+        on_change: Callable[[int, bool], None],
+        on_connected: Callable[[], None],
+    ) -> None:
+        """Receive the changes of all the switches from a server-sent events stream.
+
+        Each event carries {"id": x, "value": y} in its data field; the lines
+        starting with ":" are keep-alive comments. The method returns when the
+        server closes the stream, PushNotSupported is raised if the endpoint
+        does not exist, aiohttp.ClientError or asyncio.TimeoutError if the
+        connection is lost.
+        """
+        if not self._mud_is_allowed(self._hass, DOMAIN, self._url):
+            raise PushNotSupported(self._url)
+        try:
+            await self._async_listen_events(on_change, on_connected)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.breaker.record_failure()
+            raise
+
+    async def _async_listen_events(
+        self,
+        on_change: Callable[[int, bool], None],
+        on_connected: Callable[[], None],
+    ) -> None:
+        # The stream is opened even when the circuit is open: it is a probe too
+        async with self._session.get(
+            self._url + EVENTS_PATH,
+            headers={"Accept": "text/event-stream"},
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=self._timeout.total, sock_read=EVENTS_READ_TIMEOUT
+            ),
+        ) as response:
+            if response.status in (404, 405, 501):
+                raise PushNotSupported(self._url)
+            response.raise_for_status()
+            self.breaker.record_success()
+            on_connected()
+
+            data: list[str] = []
+            async for raw_line in response.content:
+                line = raw_line.decode("utf-8").rstrip("\r\n")
+                if line.startswith("data:"):
+                    data.append(line[5:].lstrip())
+                elif not line and data:  # End of the event
+                    try:
+                        value = json.loads("\n".join(data))
+                        on_change(int(value["id"]), bool(value["value"]))
+                    except (ValueError, KeyError, TypeError) as ex:
+                        _LOGGER.warning("Unexpected event from <%s>: %s", self._url, ex)
+                    data = []
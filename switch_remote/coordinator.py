@@ -0,0 +1,237 @@
+"""Coordinator polling all the remote switches hosted by the same server."""
+from __future__ import annotations
+from datetime import timedelta
+import asyncio
+import logging
+import random
+
+import aiohttp
+
+from homeassistant.components import persistent_notification
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from . import DOMAIN
+from .api import BulkNotSupported, PushNotSupported, SwitchRemoteApi
+
+PUSH_MIN_BACKOFF = 1
+PUSH_MAX_BACKOFF = 300
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_coordinator(
+    hass: HomeAssistant,
+    url: str,
+    update_interval: timedelta,
+    startup_timeout: float,
+    push: bool = False,
+) -> SwitchRemoteCoordinator:
+    """Return the coordinator bound to <url>, creating it the first time.
+
+    All the switches configured with the same base url share the coordinator,
+    and thus a single client, a single poll and a single push connection. The
+    first configured scan_interval, startup_timeout and push are the ones used
+    for the server.
+    """
+    coordinators = hass.data.setdefault(DOMAIN, {})
+    if url not in coordinators:
+        api = SwitchRemoteApi(hass, async_get_clientsession(hass), url)
+        coordinators[url] = SwitchRemoteCoordinator(
+            hass, api, update_interval, startup_timeout, push
+        )
+    return coordinators[url]
+
+
+class SwitchRemoteCoordinator(DataUpdateCoordinator[dict[int, bool]]):
+    """Fetch the status of every switch of a server and fan it out to the entities."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: SwitchRemoteApi,
+        update_interval: timedelta,
+        startup_timeout: float,
+        push: bool = False,
+    ) -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} {api.url}",
+            update_interval=update_interval,
+        )
+        self.api = api
+        self._switch_ids: set[int] = set()
+        self._bulk_supported = True
+        self._startup_timeout = startup_timeout
+        self._first_refresh: asyncio.Task | None = None
+        self._poll_interval = update_interval
+        self._push = push
+        self._push_task: asyncio.Task | None = None
+        self._push_connected = False
+        # Latest status requested for the switches being written
+        self._desired: dict[int, bool] = {}
+        self._writers: dict[int, asyncio.Task] = {}
+        # Incremented at every write request, to drop the polls started before it
+        self._write_seqs: dict[int, int] = {}
+
+    @callback
+    def async_add_switch(self, switch_id: int) -> None:
+        """Include <switch_id> in the next polls."""
+        self._switch_ids.add(switch_id)
+        if self.data is not None and switch_id not in self.data:
+            # Added after the first refresh: not waiting for the next poll (if any)
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_schedule_first_refresh(self) -> None:
+        """Fetch the initial status in background, without delaying the startup.
+
+        The requests of the first refresh give up after startup_timeout seconds:
+        if the server misses the deadline the switches stay unavailable until
+        the next successful poll.
+        """
+        if self._first_refresh is None:
+            self._first_refresh = self.hass.async_create_task(self.async_refresh())
+        if self._push and self._push_task is None:
+            self._push_task = self.hass.async_create_task(self._async_push_loop())
+            self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_stop_push)
+
+    async def _async_push_loop(self) -> None:
+        """Keep the stream of the switch changes open, polling while it is down.
+
+        The connection is opened again after an exponential backoff with jitter;
+        if the server does not support the push mode the switches are polled.
+        """
+        backoff = PUSH_MIN_BACKOFF
+        while True:
+            try:
+                await self.api.async_listen_events(
+                    self._async_push_value, self._async_push_on_connected
+                )
+                _LOGGER.info("<%s> closed the stream of the switch changes", self.api.url)
+            except PushNotSupported:
+                _LOGGER.info("<%s> does not support the push mode, polling it", self.api.url)
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+                _LOGGER.debug("Stream of <%s> interrupted: %s", self.api.url, ex)
+
+            if self._push_connected:
+                backoff = PUSH_MIN_BACKOFF
+                self._async_push_on_disconnected()
+            await asyncio.sleep(backoff + random.uniform(0, backoff))
+            backoff = min(2 * backoff, PUSH_MAX_BACKOFF)
+
+    @callback
+    def _async_push_on_connected(self) -> None:
+        """Stop polling, after a last refresh covering the changes missed meanwhile."""
+        _LOGGER.debug("Receiving the changes of <%s>", self.api.url)
+        self._push_connected = True
+        self.update_interval = None
+        self.hass.async_create_task(self.async_refresh())
+
+    @callback
+    def _async_push_on_disconnected(self) -> None:
+        """Poll the server until the stream is open again."""
+        self._push_connected = False
+        self.update_interval = self._poll_interval
+        self.hass.async_create_task(self.async_refresh())
+
+    @callback
+    def _async_push_value(self, switch_id: int, value: bool) -> None:
+        self.async_set_updated_data({**(self.data or {}), switch_id: value})
+
+    async def _async_stop_push(self, event: Event) -> None:
+        if self._push_task is not None:
+            self._push_task.cancel()
+
+    def is_writing(self, switch_id: int) -> bool:
+        """Return True while a new status of <switch_id> is being written."""
+        return switch_id in self._writers
+
+    @callback
+    def async_write(self, switch_id: int, value: bool) -> None:
+        """Write the status of a switch in background.
+
+        The writes requested while a PUT is in flight are coalesced: only the
+        latest status is sent. If it cannot be stored, the switch goes back to
+        its last confirmed status and a notification is raised.
+        """
+        self._desired[switch_id] = value
+        self._write_seqs[switch_id] = self._write_seqs.get(switch_id, 0) + 1
+        if switch_id not in self._writers:
+            self._writers[switch_id] = self.hass.async_create_task(
+                self._async_write(switch_id)
+            )
+
+    async def _async_write(self, switch_id: int) -> None:
+        try:
+            while True:
+                value = self._desired[switch_id]
+                stored = await self.api.async_put_value(switch_id, value)
+                if self._desired[switch_id] == value:
+                    break
+                # Outdated by a newer request, sending the latest status
+        finally:
+            del self._writers[switch_id]
+            del self._desired[switch_id]
+
+        if stored:
+            _LOGGER.debug("Switch <%s> of <%s> set to <%s>", switch_id, self.api.url, value)
+            # Not through async_set_updated_data, which would delay the next poll
+            self.data = {**(self.data or {}), switch_id: value}
+        else:
+            persistent_notification.async_create(
+                self.hass,
+                f"Impossible to turn {'on' if value else 'off'} the switch {switch_id} "
+                f"of {self.api.url}: its status was restored.",
+                title="Switch Remote",
+                notification_id=f"{DOMAIN}_{self.api.url}_{switch_id}",
+            )
+        self.async_update_listeners()
+
+    async def _async_update_data(self) -> dict[int, bool]:
+        """Fetch the switches with one bulk request, falling back to one GET each."""
+        switch_ids = sorted(self._switch_ids)
+        write_seqs = dict(self._write_seqs)
+        timeout = self._startup_timeout if self.data is None else None
+
+        if len(switch_ids) > 1 and self._bulk_supported:
+            try:
+                values = await self.api.async_get_values(switch_ids, timeout)
+            except BulkNotSupported:
+                _LOGGER.info(
+                    "<%s> has no bulk endpoint, switches will be polled one by one",
+                    self.api.url,
+                )
+                self._bulk_supported = False
+                values = await self._async_get_one_by_one(switch_ids, timeout)
+        else:
+            values = await self._async_get_one_by_one(switch_ids, timeout)
+
+        if switch_ids and not values:
+            raise UpdateFailed(f"Impossible to retrieve remote status from {self.api.url}")
+
+        # The status of the switches written meanwhile may be outdated
+        for switch_id in list(values):
+            if self.is_writing(switch_id) or self._write_seqs.get(switch_id) != write_seqs.get(switch_id):
+                del values[switch_id]
+
+        # Switches missing from this answer keep their last known status
+        return {**(self.data or {}), **values}
+
+    async def _async_get_one_by_one(
+        self, switch_ids: list[int], timeout: float | None
+    ) -> dict[int, bool]:
+        """Fetch the switches concurrently with a GET each."""
+        results = await asyncio.gather(
+            *(self.api.async_get_value(switch_id, timeout) for switch_id in switch_ids)
+        )
+        return {
+            switch_id: value
+            for switch_id, value in zip(switch_ids, results)
+            if value is not None
+        }
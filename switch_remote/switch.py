@@ -1,41 +1,56 @@
 """An example of switch configured as calculated."""
 from __future__ import annotations
-import time
 import logging
-import requests
 
 # from voluptuous.validators import PathExists
-from homeassistant.components.switch import SwitchEntity
+from homeassistant.components.switch import SCAN_INTERVAL, SwitchEntity
+from homeassistant.const import CONF_SCAN_INTERVAL
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import DOMAIN
+from .coordinator import SwitchRemoteCoordinator, async_get_coordinator
 
 NAME_KEY = "name"
 URL_KEY = "url"
+STARTUP_TIMEOUT_KEY = "startup_timeout"
+PUSH_KEY = "push"
+SWITCH_IDS_KEY = "switch_ids"
 DEFAULT_NAME = "Switch Remote"
+DEFAULT_STARTUP_TIMEOUT = 10
+DEFAULT_SWITCH_IDS = [1]
 
 
-UPDATE_STATUS = GET_LAST_STATUS = "/api/switches/1"
-
 """ To work properly this integration needs to have a configured "scan_interval".
-    Every x seconds the update() function is called fetching the remote value from the server.
+    Every x seconds the status of all the switches configured with the same url
+    is fetched from the server with a single poll.
+    A platform entry creates one switch per id in switch_ids, named "<name> <id>"
+    when there are many of them.
 
     switch:
     - platform: switch_remote
       scan_interval: 300  // number of seconds that will trigger an update
       url: localhost      // "host.docker.internal" if the integration is running in a container
+      startup_timeout: 10 // optional, seconds to wait for the initial status before going unavailable
+      push: true          // optional, receive the changes from /api/switches/events instead of polling
+      switch_ids:         // optional, ids of the remote switches (default: 1)
+        - 1
+        - 2
+
+    In push mode a single server-sent events connection per url delivers the changes
+    of all the switches; while it is down the switches are polled every scan_interval.
 """
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def setup_platform(
+async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
-    add_entities: AddEntitiesCallback,
+    async_add_entities: AddEntitiesCallback,
     discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up the sensor platform."""
@@ -48,87 +63,98 @@ def setup_platform(
         url = config[URL_KEY]
     else:
         url = "localhost"
+    if CONF_SCAN_INTERVAL in config:
+        scan_interval = config[CONF_SCAN_INTERVAL]
+    else:
+        scan_interval = SCAN_INTERVAL
+    if STARTUP_TIMEOUT_KEY in config:
+        startup_timeout = config[STARTUP_TIMEOUT_KEY]
+    else:
+        startup_timeout = DEFAULT_STARTUP_TIMEOUT
+    if PUSH_KEY in config:
+        push = bool(config[PUSH_KEY])
+    else:
+        push = False
+    if SWITCH_IDS_KEY in config:
+        switch_ids = config[SWITCH_IDS_KEY]
+        if not isinstance(switch_ids, list):
+            switch_ids = [switch_ids]
+        switch_ids = [int(switch_id) for switch_id in switch_ids]
+    else:
+        switch_ids = DEFAULT_SWITCH_IDS
+
+    # No I/O here: the initial status is fetched once the entities are added
+    coordinator = async_get_coordinator(hass, url, scan_interval, startup_timeout, push)
+    entities = []
+    for switch_id in switch_ids:
+        coordinator.async_add_switch(switch_id)
+        switch_name = name if len(switch_ids) == 1 else f"{name} {switch_id}"
+        entities.append(SwitchRemote(switch_name, coordinator, switch_id))
 
-    add_entities([SwitchRemote(name, url)])
-    return True
+    async_add_entities(entities)
 
 
-class SwitchRemote(SwitchEntity):
+class SwitchRemote(CoordinatorEntity[SwitchRemoteCoordinator], SwitchEntity):
     """This Switch uses almost all the method of its superclasses."""
 
-    def __init__(self, name, url):
+    def __init__(self, name, coordinator: SwitchRemoteCoordinator, switch_id: int):
+        super().__init__(coordinator)
         self._name = name
-        self._url = url
-        self._get_url = self._url + GET_LAST_STATUS
-        self._put_url = self._url + UPDATE_STATUS
-        remote_value = self._get_remote_value()
-        if remote_value is None:
-            self._attr_is_on = False
-        else:
-            self._attr_is_on = remote_value
+        self._switch_id = switch_id
+        self._url = coordinator.api.url
+        self._attr_is_on = bool((coordinator.data or {}).get(switch_id))
+        # Status shown before the write in progress, restored if it fails
+        self._is_on_before_write: bool | None = None
 
     @property
     def name(self):
         """Name of the entity."""
         return self._name
 
-    def _get_remote_value(self) -> bool:
-        """This method periodically checks if the status of the switch was remotely updated."""
-        response = requests.get(self._get_url, allow_redirects=True, timeout=10)
-        if response.status_code != 200:
-            _LOGGER.error("Impossible to retrieve switch status!")
-            return None
-        else:
-            try:
-                value = response.json()
-                if value and "value" in value:
-                    return bool(value["value"])
-                else:
-                    return None
-            except Exception as ex:
-                _LOGGER.error("Error parsing json object: %s", ex)
-                return None
-
-    def turn_on(self, **kwargs):
+    @property
+    def available(self) -> bool:
+        """The switch is unavailable until its status is fetched, and while the server is unreachable."""
+        return (
+            super().available
+            and self._switch_id in (self.coordinator.data or {})
+            and not self.coordinator.api.breaker.is_open
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Start fetching the initial status without blocking the startup."""
+        await super().async_added_to_hass()
+        self.coordinator.async_schedule_first_refresh()
+
+    async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
-        self.update_value(True)
+        await self.async_update_value(True)
 
-    def turn_off(self, **kwargs):
+    async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
-        self.update_value(False)
+        await self.async_update_value(False)
 
-    def update_value(self, value: bool):
-        # time.sleep(2)
+    async def async_update_value(self, value: bool):
+        """Show the new status right away, it is written to the server in background."""
+        if not self.coordinator.is_writing(self._switch_id):
+            self._is_on_before_write = self._attr_is_on
         self._attr_is_on = value
-        if self._update_remote_value():
-            _LOGGER.debug("Switch status succesfully updated to <%s>", self._attr_is_on)
-        else:
-            _LOGGER.error(
-                "Impossible to update switch's status on remote server: <%s>", self._url
-            )
-
-    def _update_remote_value(self) -> bool:
-        response = requests.put(
-            self._put_url,
-            json={"value": self._attr_is_on, "id": 1, "user": 1},
-            timeout=10,
-        )
-        if response.status_code == 200:
-            return True
-        else:
-            _LOGGER.error("Error storing new status: %s", response.json()["error"])
-            return False
-
-    def update(self) -> None:
-        """Fetch new state data for the sensor.
-        This is the only method that should fetch new data for Home Assistant.
-        """
-        remote_value = self._get_remote_value()
-        if remote_value is None:
+        self.async_write_ha_state()
+        self.coordinator.async_write(self._switch_id, value)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Apply the status fetched by the coordinator."""
+        remote_value = (self.coordinator.data or {}).get(self._switch_id)
+        if self.coordinator.is_writing(self._switch_id):
+            pass  # Keeping the optimistic status
+        elif self._is_on_before_write is not None and remote_value is None:
+            # Write failed before the status was ever fetched
+            self._attr_is_on = self._is_on_before_write
+        elif remote_value is None:
             _LOGGER.error("Impossible to retrieve remote status!")
-        else:
-            if remote_value != self._attr_is_on:
-                _LOGGER.info(
-                    "New value <%s> fetched from <%s>", remote_value, self._url
-                )
-                self._attr_is_on = remote_value
+        elif remote_value != self._attr_is_on:
+            _LOGGER.info("New value <%s> fetched from <%s>", remote_value, self._url)
+            self._attr_is_on = remote_value
+        if not self.coordinator.is_writing(self._switch_id):
+            self._is_on_before_write = None
+        super()._handle_coordinator_update()